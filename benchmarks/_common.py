@@ -0,0 +1,105 @@
+"""Helpers shared by the benchmarks: timing and machine-readable results."""
+
+from __future__ import annotations
+
+import sys
+import json
+import platform
+import statistics
+from time import perf_counter
+from typing import TYPE_CHECKING, TypedDict
+from pathlib import Path
+from argparse import ArgumentParser
+from importlib.metadata import PackageNotFoundError, version
+
+
+if TYPE_CHECKING:
+    from typing import Any
+    from argparse import Namespace
+    from collections.abc import Callable
+
+
+class Summary(TypedDict):
+    """Durations of timed passes, in seconds."""
+
+    calls: int
+    min: float
+    median: float
+    max: float
+    per_call: float | None
+    times: list[float]
+
+
+def parser(description: str | None) -> ArgumentParser:
+    """Create an argument parser with the options all benchmarks share."""
+    p = ArgumentParser(description=description)
+    p.add_argument(
+        "--repeat", type=int, default=5, help="Timed passes per benchmark (default 5)"
+    )
+    p.add_argument(
+        "--output", "-o", type=Path, help="Write JSON results here (default stdout)"
+    )
+    return p
+
+
+def time_passes(
+    run: Callable[[], object],
+    *,
+    n_calls: int,
+    repeat: int,
+    setup: Callable[[], object] | None = None,
+) -> Summary:
+    """Time ``repeat`` passes of ``run``, each making ``n_calls`` calls.
+
+    ``setup`` is called (untimed) before each pass, e.g. to clear caches.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        run()
+        times.append(perf_counter() - start)
+    return summarize(times, n_calls=n_calls)
+
+
+def summarize(times: list[float], *, n_calls: int) -> Summary:
+    """Summarize the durations of passes that made ``n_calls`` calls each."""
+    median = statistics.median(times)
+    return Summary(
+        calls=n_calls,
+        min=min(times),
+        median=median,
+        max=max(times),
+        per_call=median / n_calls if n_calls else None,
+        times=times,
+    )
+
+
+def environment() -> dict[str, Any]:
+    """Describe the environment, so results of different versions can be compared."""
+    return dict(
+        python=sys.version.split()[0],
+        platform=platform.platform(),
+        packages={name: _version(name) for name in _PACKAGES},
+    )
+
+
+def write_results(args: Namespace, results: dict[str, Any], **params: object) -> None:
+    """Write results with environment and parameters as JSON."""
+    data = dict(environment=environment(), params=params, results=results)
+    text = json.dumps(data, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        args.output.write_text(f"{text}\n")
+
+
+_PACKAGES = ("scanpydoc", "sphinx", "sphinx-autodoc-typehints", "docutils")
+
+
+def _version(name: str) -> str | None:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
@@ -0,0 +1,207 @@
+"""Benchmark :mod:`scanpydoc.definition_list_typed_field` against Sphinx’s default.
+
+Renders the parameters of synthetic classes with 10, 100, and 1000 parameters
+(with numpydoc-style types and descriptions of realistic length) through
+``make_field`` of Sphinx’s :class:`~sphinx.domains.python.PyTypedField`
+and of scanpydoc’s :class:`~scanpydoc.definition_list_typed_field.DLTypedField`
+(also with ``compact_field_items``), and reports per field:
+
+- the time spent in ``make_field``
+- the number of doctree nodes
+- the size of the HTML (with references resolved)
+
+Usage::
+
+    python benchmarks/bench_definition_list_typed_field.py --sizes 10 1000 -o out.json
+"""
+
+from __future__ import annotations
+
+import io
+import tempfile
+from typing import TYPE_CHECKING
+from pathlib import Path
+
+from _common import parser, time_passes, write_results
+from docutils import nodes
+from sphinx.domains.python import (  # type: ignore[attr-defined,unused-ignore]
+    PyObject,
+    PyTypedField,
+)
+
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from sphinx.application import Sphinx
+    from sphinx.builders.html import StandaloneHTMLBuilder
+
+
+MODULE = "synth_pkg"
+TYPES = [
+    "int",
+    "bool, optional",
+    "str | None",
+    "AnnData",
+    "Mapping[str, AnnData]",
+    "Sequence of str",
+    "{'linear', 'log'}, default 'linear'",
+    "float, default 0.5",
+    "Axes | None",
+    "Colormap or str, optional",
+]
+"""Type specifications, cycled through by the parameters."""
+CLASSES = sorted({"Axes", "AnnData", "Colormap", "Mapping", "Sequence"})
+"""Names in :data:`TYPES` that are documented, so references to them resolve."""
+
+STOCK = next(
+    ft
+    for ft in PyObject.doc_field_types
+    if isinstance(ft, PyTypedField) and ft.name == "parameter"
+)
+"""Sphinx’s field type for parameters, before scanpydoc replaces it."""
+
+
+def make_app(root: Path) -> Sphinx:
+    """Create a Sphinx app whose environment is ready to render fields."""
+    from sphinx.application import Sphinx
+
+    (root / "conf.py").write_text("")
+    app = Sphinx(
+        srcdir=root,
+        confdir=root,
+        outdir=root / "html",
+        doctreedir=root / "doctrees",
+        buildername="html",
+        confoverrides=dict(
+            extensions=["scanpydoc.definition_list_typed_field"],
+            html_theme="basic",
+        ),
+        status=None,
+        warning=io.StringIO(),
+        freshenv=True,
+    )
+    env = app.env
+    env.current_document.docname = "index"
+    env.ref_context["py:module"] = MODULE
+    # document the classes, so references resolve like in real documentation
+    domain = env.domains.python_domain
+    for name in CLASSES:
+        domain.note_object(f"{MODULE}.{name}", "class", f"{MODULE}.{name}")
+    return app
+
+
+def make_inputs(
+    n_params: int, k: int
+) -> tuple[dict[str, list[nodes.Node]], list[tuple[str, list[nodes.Node]]]]:
+    """Make the types and items of the parameters of class ``k``.
+
+    ``make_field`` consumes the types, so they need to be recreated for each call.
+    """
+    types: dict[str, list[nodes.Node]] = {}
+    items: list[tuple[str, list[nodes.Node]]] = []
+    for i in range(n_params):
+        name = f"param_{i}"
+        types[name] = [nodes.Text(TYPES[(i + k) % len(TYPES)])]
+        desc = f"Parameter {i} of class {k}, which controls some aspect of the result."
+        items.append((name, [nodes.inline("", desc)]))
+    return types, items
+
+
+def render(app: Sphinx, field: nodes.field) -> str:
+    """Render a field to HTML after resolving its references."""
+    from sphinx.util.docutils import new_document
+
+    doc = new_document("index")
+    doc += nodes.field_list("", field.deepcopy())
+    app.env.apply_post_transforms(doc, "index")
+    builder: StandaloneHTMLBuilder = app.builder  # type: ignore[assignment]
+    return builder.render_partial(doc[0])["fragment"]
+
+
+def bench_variant(
+    app: Sphinx,
+    field_type: PyTypedField,
+    *,
+    n_params: int,
+    n_classes: int,
+    repeat: int,
+) -> dict[str, Any]:
+    """Time rendering all classes’ fields, and measure the results."""
+    inputs: list[tuple[dict[str, list[nodes.Node]], Any]] = []
+    fields: list[nodes.field] = []
+
+    def setup() -> None:
+        inputs[:] = [make_inputs(n_params, k) for k in range(n_classes)]
+        fields.clear()
+
+    def run() -> None:
+        for types, items in inputs:
+            fields.append(field_type.make_field(types, "py", items, env=app.env))
+
+    timing = time_passes(run, n_calls=n_classes, repeat=repeat, setup=setup)
+    n_nodes = sum(sum(1 for _ in field.findall()) for field in fields)
+    html_bytes = sum(len(render(app, field).encode()) for field in fields)
+    return dict(
+        time=timing,
+        nodes_per_field=n_nodes / n_classes,
+        html_bytes_per_field=html_bytes / n_classes,
+    )
+
+
+def bench_size(
+    app: Sphinx, *, n_params: int, n_classes: int, repeat: int
+) -> dict[str, Any]:
+    """Compare Sphinx’s rendering with scanpydoc’s for one number of parameters."""
+    from scanpydoc.definition_list_typed_field import DLTypedField
+
+    dl_typed_field = next(
+        ft
+        for ft in PyObject.doc_field_types
+        if isinstance(ft, DLTypedField) and ft.name == "parameter"
+    )
+    results = {}
+    for variant, field_type, compact in [
+        ("sphinx", STOCK, False),
+        ("scanpydoc", dl_typed_field, False),
+        ("scanpydoc-compact", dl_typed_field, True),
+    ]:
+        app.config.compact_field_items = compact
+        results[variant] = bench_variant(
+            app, field_type, n_params=n_params, n_classes=n_classes, repeat=repeat
+        )
+    app.config.compact_field_items = False
+    return results
+
+
+def main() -> None:
+    """Run all benchmarks and write the results."""
+    p = parser(__doc__.split("\n", 1)[0])
+    p.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000],
+        help="Parameters per class (default 10 100 1000)",
+    )
+    p.add_argument(
+        "--classes", type=int, default=10, help="Classes per size (default 10)"
+    )
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(Path(tmp))
+        results = {
+            str(n): bench_size(
+                app, n_params=n, n_classes=args.classes, repeat=args.repeat
+            )
+            for n in args.sizes
+        }
+
+    write_results(
+        args, results, sizes=args.sizes, classes=args.classes, repeat=args.repeat
+    )
+
+
+if __name__ == "__main__":
+    main()
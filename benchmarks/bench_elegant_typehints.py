@@ -0,0 +1,339 @@
+"""Benchmark :mod:`scanpydoc.elegant_typehints` on a synthetic API.
+
+Generates a package with many functions and classes using nested generics,
+PEP 695 type aliases, literals, unions, tuple returns with named
+``Returns`` sections, and classes whose bases need ``qualname_overrides``.
+It is documented with Sphinx (timed end to end), and the inputs scanpydoc’s hooks
+see during that build are recorded and replayed to time these hooks separately:
+
+- ``typehints_formatter``
+- ``_return_tuple.process_docstring``
+- ``_autodoc_patch.add_directive_header`` (only scanpydoc’s part)
+- ``_last_resolve``
+
+Usage::
+
+    python benchmarks/bench_elegant_typehints.py --functions 2000 -o results.json
+"""
+
+from __future__ import annotations
+
+import io
+import sys
+import shutil
+import tempfile
+from time import perf_counter
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+from pathlib import Path
+from textwrap import dedent
+
+from _common import parser, summarize, time_passes, write_results
+
+
+if TYPE_CHECKING:
+    from typing import Any
+    from collections.abc import Iterator
+
+    from _common import Summary
+    from docutils import nodes
+    from sphinx.addnodes import pending_xref
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+    from sphinx.ext.autodoc import ClassDocumenter
+
+
+PACKAGE = "synth_pkg"
+N_CLASSES = 50
+N_PAGES = 20
+
+
+def generate(root: Path, n_functions: int) -> dict[str, str]:
+    """Write the package and documentation sources, return ``qualname_overrides``."""
+    pkg = root / PACKAGE
+    pkg.mkdir()
+    (pkg / "_core.py").write_text("".join(_core_module(n_functions)))
+    classes = ["Box", *(f"{c}{k}" for c in ("Thing", "Sub") for k in range(N_CLASSES))]
+    names = [*classes, *(f"f{i}" for i in range(n_functions))]
+    (pkg / "__init__.py").write_text(
+        f"from ._core import {', '.join(names)}\n\n__all__ = {names!r}\n"
+    )
+
+    docs = root / "docs"
+    docs.mkdir()
+    (docs / "conf.py").write_text("")
+    toctree = "\n".join(f"   page{p}" for p in range(N_PAGES))
+    (docs / "index.rst").write_text(f"API\n===\n\n.. toctree::\n\n{toctree}\n")
+    for p in range(N_PAGES):
+        directives = [
+            f".. autofunction:: {PACKAGE}.f{i}" for i in range(p, n_functions, N_PAGES)
+        ]
+        directives += [
+            f".. autoclass:: {PACKAGE}.Sub{k}" for k in range(p, N_CLASSES, N_PAGES)
+        ]
+        body = "\n\n".join(directives)
+        (docs / f"page{p}.rst").write_text(f"Page {p}\n=======\n\n{body}\n")
+
+    return {f"{PACKAGE}._core.{name}": f"{PACKAGE}.{name}" for name in classes}
+
+
+def _core_module(n_functions: int) -> Iterator[str]:
+    """Generate the source of the module defining everything."""
+    yield "from collections.abc import Mapping, Sequence\n"
+    yield "from typing import Literal\n\n\n"
+    yield "class Box[T]:\n    pass\n\n\n"
+    for k in range(N_CLASSES):
+        yield f"class Thing{k}:\n    pass\n\n\n"
+        yield f"class Sub{k}(Thing{k}):\n    '''Subclass {k}.'''\n\n\n"
+        yield f"type Alias{k} = dict[str, Sequence[Box[Thing{k}]]]\n\n\n"
+    for i in range(n_functions):
+        k, k2 = i % N_CLASSES, (i * 7) % N_CLASSES
+        literal = ", ".join(repr(f"opt{j}") for j in range(i % 7 + 2))
+        yield dedent(f'''\
+            def f{i}(
+                a: Box[Mapping[str, Thing{k}]],
+                b: Literal[{literal}],
+                c: Thing{k} | Thing{k2} | None,
+                d: Alias{k} | None = None,
+            ) -> tuple[Thing{k}, Mapping[str, Box[int]]]:
+                """Function {i}.
+
+                Parameters
+                ----------
+                a
+                    An a.
+                b
+                    A b.
+                c
+                    A c.
+                d
+                    A d.
+
+                Returns
+                -------
+                thing
+                    A thing.
+                mapping
+                    A mapping.
+                """
+
+
+        ''')
+
+
+class Recorder:
+    """Records the inputs of scanpydoc’s hooks during a build."""
+
+    def __init__(self, app: Sphinx) -> None:
+        from scanpydoc.elegant_typehints import _autodoc_patch
+
+        self.annotations: list[object] = []
+        self.docstrings: list[tuple[str, str, object, list[str]]] = []
+        self.headers: list[tuple[object, list[str]]] = []
+        self.xrefs: list[tuple[pending_xref, nodes.TextElement]] = []
+
+        formatter = app.config.typehints_formatter
+
+        def record_annotation(annotation: object, *args: object) -> str | None:
+            self.annotations.append(annotation)
+            return formatter(annotation, *args)  # type: ignore[no-any-return]
+
+        app.config.typehints_formatter = record_annotation
+        app.connect("autodoc-process-docstring", self._record_docstring, 999)
+        app.connect("missing-reference", self._record_xref, 500)
+
+        orig = _autodoc_patch.orig
+
+        def record_header(documenter: ClassDocumenter, sig: str) -> None:
+            orig(documenter, sig)
+            self.headers.append((documenter.object, list(documenter.directive.result)))
+
+        _autodoc_patch.orig = record_header  # type: ignore[assignment]
+
+    def _record_docstring(
+        self,
+        _app: Sphinx,
+        what: str,
+        name: str,
+        obj: object,
+        _options: object,
+        lines: list[str],
+    ) -> None:
+        self.docstrings.append((what, name, obj, lines.copy()))
+
+    def _record_xref(
+        self,
+        _app: Sphinx,
+        _env: BuildEnvironment,
+        node: pending_xref,
+        contnode: nodes.TextElement,
+    ) -> None:
+        self.xrefs.append((node.deepcopy(), contnode.deepcopy()))
+
+
+def make_app(
+    root: Path, overrides: dict[str, str], *, jobs: int = 1, name: str = "build"
+) -> Sphinx:
+    """Create a fresh Sphinx app for the generated documentation."""
+    from sphinx.application import Sphinx
+
+    out = root / name
+    shutil.rmtree(out, ignore_errors=True)
+    return Sphinx(
+        srcdir=root / "docs",
+        confdir=root / "docs",
+        outdir=out / "html",
+        doctreedir=out / "doctrees",
+        buildername="html",
+        confoverrides=dict(
+            extensions=[
+                "sphinx.ext.autodoc",
+                "sphinx.ext.napoleon",
+                "sphinx.ext.intersphinx",
+                "sphinx_autodoc_typehints",
+                "scanpydoc.elegant_typehints",
+            ],
+            qualname_overrides=overrides,
+            autodoc_use_legacy_class_based=True,
+            autodoc_default_options={"show-inheritance": True},
+            html_theme="basic",
+        ),
+        status=None,
+        warning=io.StringIO(),
+        freshenv=True,
+        parallel=jobs,
+    )
+
+
+def bench_build(
+    root: Path, overrides: dict[str, str], *, jobs: int, repeat: int
+) -> dict[str, Any]:
+    """Time full builds from scratch."""
+    times = []
+    for r in range(repeat):
+        app = make_app(root, overrides, jobs=jobs, name=f"build{r}")
+        start = perf_counter()
+        app.build()
+        times.append(perf_counter() - start)
+    return {**summarize(times, n_calls=1), "jobs": jobs}
+
+
+def bench_hooks(rec: Recorder, app: Sphinx, *, repeat: int) -> dict[str, Any]:
+    """Time scanpydoc’s hooks on the inputs recorded during a build."""
+    return {
+        "typehints_formatter": _bench_formatter(rec, app, repeat=repeat),
+        "process_docstring": _bench_process_docstring(rec, app, repeat=repeat),
+        "add_directive_header": _bench_directive_header(rec, repeat=repeat),
+        "_last_resolve": _bench_last_resolve(rec, app, repeat=repeat),
+    }
+
+
+def _bench_formatter(rec: Recorder, app: Sphinx, *, repeat: int) -> Summary:
+    from scanpydoc.elegant_typehints import _formatting
+
+    def format_all() -> None:
+        for annotation in rec.annotations:
+            _formatting.typehints_formatter(annotation, app.config, app)
+
+    return time_passes(
+        format_all,
+        n_calls=len(rec.annotations),
+        repeat=repeat,
+        setup=_formatting.clear_cache,
+    )
+
+
+def _bench_process_docstring(rec: Recorder, app: Sphinx, *, repeat: int) -> Summary:
+    from scanpydoc.elegant_typehints import _return_tuple
+
+    def process_all() -> None:
+        for what, name, obj, lines in rec.docstrings:
+            _return_tuple.process_docstring(app, what, name, obj, None, lines.copy())
+
+    def clear_cache() -> None:
+        app.env.scanpydoc_docstring_cache = {}  # type: ignore[attr-defined]
+
+    return time_passes(
+        process_all, n_calls=len(rec.docstrings), repeat=repeat, setup=clear_cache
+    )
+
+
+def _bench_directive_header(rec: Recorder, *, repeat: int) -> Summary:
+    from scanpydoc.elegant_typehints import _autodoc_patch
+
+    documenters = [_FakeDocumenter(obj, lines) for obj, lines in rec.headers]
+
+    def add_headers() -> None:
+        for documenter in documenters:
+            _autodoc_patch.add_directive_header(documenter, "")  # type: ignore[arg-type]
+
+    _autodoc_patch.orig = _FakeDocumenter.replay_header  # type: ignore[assignment]
+    return time_passes(add_headers, n_calls=len(documenters), repeat=repeat)
+
+
+def _bench_last_resolve(rec: Recorder, app: Sphinx, *, repeat: int) -> Summary:
+    from scanpydoc.elegant_typehints import _last_resolve
+
+    xrefs: list[tuple[pending_xref, nodes.TextElement]] = []
+
+    def copy_xrefs() -> None:  # resolving modifies the nodes
+        xrefs[:] = [(n.deepcopy(), c.deepcopy()) for n, c in rec.xrefs]
+
+    def resolve_all() -> None:
+        for node, contnode in xrefs:
+            _last_resolve(app, app.env, node, contnode)
+
+    return time_passes(
+        resolve_all, n_calls=len(rec.xrefs), repeat=repeat, setup=copy_xrefs
+    )
+
+
+class _FakeDocumenter:
+    """Replays a recorded header instead of letting autodoc generate it."""
+
+    def __init__(self, obj: object, header: list[str]) -> None:
+        self.object = obj
+        self.header = header
+        self.directive = SimpleNamespace(result=None)
+
+    def replay_header(self, _sig: str) -> None:
+        from docutils.statemachine import StringList
+
+        self.directive.result = StringList(self.header.copy())
+
+
+def main() -> None:
+    """Run all benchmarks and write the results."""
+    p = parser(__doc__.split("\n", 1)[0])
+    p.add_argument(
+        "--functions", type=int, default=2000, help="Generated functions (default 2000)"
+    )
+    p.add_argument("--jobs", "-j", type=int, default=1, help="Parallel build jobs")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        overrides = generate(root, args.functions)
+        sys.path.insert(0, str(root))
+
+        results = dict(
+            build=bench_build(root, overrides, jobs=args.jobs, repeat=args.repeat)
+        )
+        # record hook inputs in a serial build, then replay them
+        app = make_app(root, overrides, name="record")
+        rec = Recorder(app)
+        app.build()
+        results.update(bench_hooks(rec, app, repeat=args.repeat))
+
+    write_results(
+        args,
+        results,
+        functions=args.functions,
+        classes=N_CLASSES,
+        annotations=len(rec.annotations),
+        repeat=args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
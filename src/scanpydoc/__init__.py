@@ -7,6 +7,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 from textwrap import indent
+from functools import wraps
 from collections.abc import Callable
 
 from ._version import __version__
@@ -16,7 +17,14 @@ if TYPE_CHECKING:
     from sphinx.application import Sphinx
 
 
-metadata = dict(version=__version__, env_version=1, parallel_read_safe=True)
+# All state that changes while reading is stored in the environment,
+# other module-level state is only set up before parallel workers are forked.
+metadata = dict(
+    version=__version__,
+    env_version=2,
+    parallel_read_safe=True,
+    parallel_write_safe=True,
+)
 
 # Can’t seem to be able to do this in numpydoc style:
 # https://github.com/sphinx-doc/sphinx/issues/5887
@@ -33,8 +41,20 @@ Returns
 
 
 def _setup_sig[C: Callable[..., Any]](fn: C) -> C:
-    fn.__doc__ = f"{fn.__doc__ or ''}\n\n{indent(setup_sig_str, ' ' * 4)}"
-    return fn
+    """Document a ``setup`` function and track what the extension registers.
+
+    See :mod:`scanpydoc._pickle_size`.
+    """
+
+    @wraps(fn)
+    def setup(app: Sphinx) -> Any:  # noqa: ANN401
+        from ._pickle_size import tracking
+
+        with tracking(app):
+            return fn(app)
+
+    setup.__doc__ = f"{fn.__doc__ or ''}\n\n{indent(setup_sig_str, ' ' * 4)}"
+    return setup  # type: ignore[return-value]
 
 
 @_setup_sig
@@ -0,0 +1,74 @@
+"""Report how much scanpydoc contributes to the pickled environment."""
+
+from __future__ import annotations
+
+import pickle
+from typing import TYPE_CHECKING
+from weakref import WeakKeyDictionary
+from contextlib import contextmanager
+
+from sphinx.util import logging
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from sphinx.application import Sphinx
+
+
+logger = logging.getLogger(__name__)
+
+SET_CONFIG_VALUES = ("typehints_formatter",)
+"""Config values of other extensions that scanpydoc’s extensions set."""
+
+_registered: WeakKeyDictionary[Sphinx, set[str]] = WeakKeyDictionary()
+"""Config values registered by scanpydoc’s extensions, per app."""
+
+
+@contextmanager
+def tracking(app: Sphinx) -> Iterator[None]:
+    """Track config values registered while setting up a scanpydoc extension.
+
+    The first time this is used for ``app``, :func:`report_pickle_sizes` is connected.
+    """
+    if app not in _registered:
+        _registered[app] = set()
+        app.connect("build-finished", report_pickle_sizes)
+    before = set(app.config.values)
+    try:
+        yield
+    finally:
+        _registered[app].update(set(app.config.values) - before)
+
+
+def pickle_sizes(app: Sphinx) -> dict[str, int]:
+    """Get the pickled size in bytes of each scanpydoc config value and env key."""
+    names = _registered.get(app, set()) | set(SET_CONFIG_VALUES)
+    sizes = {
+        f"config.{name}": _size(app.config[name])
+        for name in sorted(names)
+        if name in app.config
+    }
+    sizes.update(
+        (f"env.{name}", _size(value))
+        for name, value in vars(app.env).items()
+        if name.startswith("scanpydoc_")
+    )
+    return sizes
+
+
+def report_pickle_sizes(app: Sphinx, exception: Exception | None) -> None:
+    """Log :func:`pickle_sizes` in verbose mode."""
+    if exception is not None or app.verbosity < 1:
+        return
+    for name, size in sorted(pickle_sizes(app).items()):
+        logger.verbose(
+            "scanpydoc: %s contributes %d bytes to the environment", name, size
+        )
+
+
+def _size(value: object) -> int:
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return 0  # Sphinx doesn’t pickle it either
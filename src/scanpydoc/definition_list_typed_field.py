@@ -3,14 +3,46 @@
 This extension replaces the default :class:`~sphinx.domains.python.PyTypedField`
 with a derivative :class:`DLTypedField`, which renders item items
 (e.g. function parameters) as definition lists instead of simple paragraphs.
+Names in numpydoc-style types like ``{'a', 'b'} or Mapping[str, int], optional``
+become references, while literals and keywords like ``optional`` are left alone.
+
+With ``compact_field_items = True``, items are rendered with fewer nodes:
+Plain names and descriptions aren’t wrapped in ``<strong>`` and ``<p>`` elements,
+and the type follows the name directly.
+The :doc:`scanpydoc theme <scanpydoc.theme>` styles these lists like the default ones.
+
+With ``field_items_collapse_threshold = n``, fields with more than ``n`` items
+are rendered inside a collapsed ``<details>`` element in HTML,
+so browsers only lay them out when they’re expanded.
+The :doc:`scanpydoc theme <scanpydoc.theme>` expands them
+when navigating to an anchor inside, in case the browser doesn’t.
+
+With ``deduplicate_field_items = True``, items that are documented identically
+(same field, name, type, and description) in several places are only rendered
+in full the first time. Other occurrences link to that description instead,
+if it is long enough for that to pay off.
+
+With ``field_items_index = True``, items get anchors, and HTML builds contain
+a machine-readable index of them in ``_field_items/``, sharded by module:
+``index.json`` lists the shards, e.g. ``{"shards": {"mod.sub": "mod.sub.json"}}``,
+and each shard maps the objects’ full names to their page, anchor, and items,
+e.g. ``{"mod.sub.f": {"url": "api.html", "anchor": "mod.sub.f", "fields":
+{"parameter": [["a", "int | None", "mod.sub.f-parameter-a"]]}}}``.
 """
 
 from __future__ import annotations
 
+import re
+import json
+import shutil
+import hashlib
 from typing import TYPE_CHECKING
+from pathlib import Path
+from functools import cache
 
 from sphinx import addnodes
 from docutils import nodes
+from sphinx.util.nodes import make_refnode
 from sphinx.domains.python import (  # type: ignore[attr-defined,unused-ignore]
     PyObject,
     PyTypedField,
@@ -20,13 +52,50 @@ from . import metadata, _setup_sig
 
 
 if TYPE_CHECKING:
-    from typing import Any, ClassVar
-    from collections.abc import Iterable
+    from typing import Any, Literal, ClassVar
+    from collections.abc import Callable, Iterable, Iterator
 
     from sphinx.application import Sphinx
     from sphinx.environment import BuildEnvironment
+    from sphinx.writers.html5 import HTML5Translator
 
     type TextLikeNode = nodes.Text | nodes.TextElement
+    type _TokenKind = Literal["obj", "literal", "text"]
+    type _SharedItems = dict[str, tuple[set[str], set[str]]]
+    """Keys of items rendered in full and keys of items linked to, by document."""
+    type _IndexedObject = dict[str, Any]
+    """Module, anchor, and fields with their items’ name, type, and anchor."""
+    type _Index = dict[str, dict[str, _IndexedObject]]
+    """Indexed objects by full name, by document."""
+
+
+SHARED_ROLE = "scanpydoc-shared-item"
+SHARED_MIN_LENGTH = 80
+"""Shorter descriptions aren’t worth replacing by a link."""
+INDEX_DIR = "_field_items"
+
+TYPE_SPEC_SPLIT = re.compile(
+    r"""('[^']*'|"[^"]*"|\s*(?:[\[\](){},|]|\.\.\.)(?:\s*(?:or|of|and|to)\s)?\s*"""
+    r"|\s+(?:or|of|and|to)\s+)"
+)
+"""Quoted strings and delimiters in numpydoc-style type specifications."""
+TYPE_SPEC_PART = re.compile(r"(\s*)(default\b\s*[=:]?\s*)?(.*?)(\s*)", re.DOTALL)
+"""Whitespace, ``default`` keyword, value, and whitespace."""
+TYPE_SPEC_NUMBER = re.compile(r"[+-]?\d[\d_]*(?:\.\d*)?(?:e[+-]?\d+)?j?", re.IGNORECASE)
+
+_xref_templates: dict[tuple[object, ...], list[nodes.Node]] = {}
+"""Cross-reference nodes by the arguments and context they were made with."""
+_owners: dict[str, list[str]] | None = None
+"""Documents rendering an item in full by key, built from the environment."""
+_dropped: set[str] = set()
+"""Keys of items that removed documents rendered in full."""
+
+
+class FieldItemsDetails(nodes.General, nodes.Element):
+    """Collapsible container for the list of a field’s items.
+
+    Rendered as ``<details>`` in HTML, and transparent for other builders.
+    """
 
 
 class DLTypedField(PyTypedField):
@@ -54,46 +123,426 @@ class DLTypedField(PyTypedField):
         def make_refs(
             role_name: str, name: str, node: type[TextLikeNode]
         ) -> list[nodes.Node]:
-            return self.make_xrefs(role_name, domain, name, node, env=env, **kw)
+            return self._make_refs(role_name, domain, name, node, env=env, **kw)
+
+        compact = env is not None and getattr(env.config, "compact_field_items", False)
 
         def handle_item(
             fieldarg: str, content: list[nodes.inline]
         ) -> nodes.definition_list_item:
-            term = nodes.term()
-            term += make_refs(self.rolename, fieldarg, addnodes.literal_strong)
+            if compact and not self.rolename:  # names are styled by the theme
+                term = nodes.term("", fieldarg)
+            else:
+                term = nodes.term()
+                term += make_refs(self.rolename, fieldarg, addnodes.literal_strong)
+            head: list[nodes.Element] = [term]
 
             field_type = types.pop(fieldarg, None)
             if field_type is not None:
-                # convert `param : SomeClass` into reference
-                if len(field_type) == 1 and isinstance(field_type[0], nodes.Text):
-                    classifier_content = make_refs(
-                        self.typerolename,
-                        field_type[0].astext(),
-                        addnodes.literal_emphasis,
-                    )
+                classifier_content = self._convert_type(field_type, domain, env, **kw)
+                # Sphinx tries to fixup classifiers without rawsource,
+                # but for this expects attributes we don’t have. Thus “×”.
+                classifier = nodes.classifier("×", "", *classifier_content)
+                if compact:  # a sibling of the term, as docutils intends
+                    head.append(classifier)
                 else:
-                    classifier_content = field_type
-                term += [
-                    # https://github.com/sphinx-doc/sphinx/issues/10815
-                    nodes.Text(" "),
-                    # Sphinx tries to fixup classifiers without rawsource,
-                    # but for this expects attributes we don’t have. Thus “×”.
-                    nodes.classifier("×", "", *classifier_content),
-                ]
-
-            def_content = nodes.paragraph("", "", *content)
+                    term += [
+                        # https://github.com/sphinx-doc/sphinx/issues/10815
+                        nodes.Text(" "),
+                        classifier,
+                    ]
+
+            paragraph_cls = addnodes.compact_paragraph if compact else nodes.paragraph
+            def_content = paragraph_cls("", "", *content)
+            if env is not None and getattr(
+                env.config, "deduplicate_field_items", False
+            ):
+                def_content = _share(env, self.name, head, def_content)
             definition = nodes.definition("", def_content)
 
-            return nodes.definition_list_item("", term, definition)
+            return nodes.definition_list_item("", *head, definition)
 
         field_name = nodes.field_name("", self.label)
         assert not self.can_collapse  # noqa: S101
-        body_node = self.list_type(classes=["simple"])
+        body_node = self.list_type(
+            classes=["simple", "field-items-compact"] if compact else ["simple"]
+        )
+        indexed = _indexed_object(env, kw.get("location"))
         for field_arg, content in items:
-            body_node += handle_item(field_arg, content)
-        field_body = nodes.field_body("", body_node)
+            item = handle_item(field_arg, content)
+            if indexed is not None:
+                _index_item(indexed, self.name, field_arg, item)
+            body_node += item
+        threshold: int | None = getattr(
+            env and env.config, "field_items_collapse_threshold", None
+        )
+        field_body = nodes.field_body()
+        if threshold is not None and len(body_node) > threshold:
+            summary = f"{len(body_node)} {self.label.lower()}"
+            field_body += FieldItemsDetails("", body_node, summary=summary)
+        else:
+            field_body += body_node
         return nodes.field("", field_name, field_body)
 
+    def _make_refs(
+        self,
+        role_name: str,
+        domain: str,
+        name: str,
+        node: type[TextLikeNode],
+        env: BuildEnvironment | None = None,
+        **kw: Any,  # noqa: ANN401
+    ) -> list[nodes.Node]:
+        def make() -> list[nodes.Node]:
+            return self.make_xrefs(role_name, domain, name, node, env=env, **kw)
+
+        return _from_template((role_name, domain, name, node), make, env)
+
+    def _convert_type(
+        self,
+        field_type: list[nodes.Node],
+        domain: str,
+        env: BuildEnvironment | None = None,
+        **kw: Any,  # noqa: ANN401
+    ) -> list[nodes.Node]:
+        # convert `param : SomeClass` into reference
+        if len(field_type) == 1 and isinstance(field_type[0], nodes.Text):
+            return self._make_type_refs(
+                domain, field_type[0].astext(), emphasis=True, env=env, **kw
+            )
+        # e.g. ``int`` or None: link names in the text parts
+        return [
+            n
+            for node in field_type
+            for n in (
+                self._make_type_refs(
+                    domain, node.astext(), emphasis=False, env=env, **kw
+                )
+                if isinstance(node, nodes.Text)
+                else [node]
+            )
+        ]
+
+    def _make_type_refs(
+        self,
+        domain: str,
+        spec: str,
+        *,
+        emphasis: bool,
+        env: BuildEnvironment | None = None,
+        **kw: Any,  # noqa: ANN401
+    ) -> list[nodes.Node]:
+        """Convert a numpydoc-style type specification into nodes.
+
+        Names become references, quoted strings and numbers literals.
+        Everything else (e.g. ``optional`` or ``of``) is rendered as text,
+        with ``emphasis`` like Sphinx does.
+        """
+        tokens = _tokenize_type_spec(spec)
+        if not emphasis and all(k == "text" for k, _ in tokens):
+            return [nodes.Text(spec)]
+
+        def make() -> list[nodes.Node]:
+            result: list[nodes.Node] = []
+            for kind, text in tokens:
+                if kind == "obj":
+                    result += self.make_xrefs(
+                        self.typerolename,
+                        domain,
+                        text,
+                        addnodes.literal_emphasis,
+                        env=env,
+                        **kw,
+                    )
+                elif kind == "literal":
+                    result.append(nodes.literal(text, text))
+                elif emphasis:
+                    result.append(addnodes.literal_emphasis(text, text))
+                else:
+                    result.append(nodes.Text(text))
+            return result
+
+        return _from_template(("spec", domain, spec, emphasis), make, env)
+
+
+def _from_template(
+    key: tuple[object, ...],
+    make: Callable[[], list[nodes.Node]],
+    env: BuildEnvironment | None,
+) -> list[nodes.Node]:
+    """Make nodes, or copy them if they were made with the same arguments before."""
+    if env is None:
+        return make()
+    # The Python domain’s xrefs only depend on these (not e.g. `location`),
+    # so the same types don’t need to be parsed into nodes again and again.
+    key = (*key, env.ref_context.get("py:module"), env.ref_context.get("py:class"))
+    if (template := _xref_templates.get(key)) is None:
+        template = _xref_templates[key] = make()
+    return [n.deepcopy() for n in template]
+
+
+@cache
+def _tokenize_type_spec(spec: str) -> tuple[tuple[_TokenKind, str], ...]:
+    """Split a type specification like ``{'a', 'b'} or int, default 'a'``."""
+    tokens: list[tuple[_TokenKind, str]] = []
+    for i, part in enumerate(TYPE_SPEC_SPLIT.split(spec)):
+        if i % 2:  # a match of the pattern
+            tokens.append(("literal" if part[0] in "'\"" else "text", part))
+        else:
+            tokens.extend(_tokenize_type_spec_part(part))
+    merged: list[tuple[_TokenKind, str]] = []
+    for kind, text in tokens:
+        if not text:
+            continue
+        if kind == "text" and merged and merged[-1][0] == "text":
+            merged[-1] = kind, merged[-1][1] + text
+        else:
+            merged.append((kind, text))
+    return tuple(merged)
+
+
+def _tokenize_type_spec_part(part: str) -> Iterator[tuple[_TokenKind, str]]:
+    match = TYPE_SPEC_PART.fullmatch(part)
+    assert match is not None  # noqa: S101
+    lead, default, value, trail = match.groups()
+    yield "text", lead
+    yield "text", default or ""
+    if value == "optional":
+        yield "text", value
+    elif TYPE_SPEC_NUMBER.fullmatch(value):
+        yield "literal", value
+    else:
+        yield "obj", value
+    yield "text", trail
+
+
+def _clear_xref_templates(_app: Sphinx) -> None:
+    _xref_templates.clear()
+
+
+def _share(
+    env: BuildEnvironment,
+    field: str,
+    head: list[nodes.Element],
+    paragraph: nodes.paragraph,
+) -> nodes.paragraph:
+    """Register an item, and replace its description if it’s rendered elsewhere."""
+    if len(paragraph.astext()) < SHARED_MIN_LENGTH:
+        return paragraph
+    key = _item_key(field, *head, paragraph)
+    owned, referenced = _get_shared(env).setdefault(env.docname, (set(), set()))
+    owners = _get_owners(env)
+    if key not in owners:
+        owners[key] = [env.docname]
+        owned.add(key)
+        head[0]["ids"].append(f"item-{key}")
+        return paragraph
+    referenced.add(key)
+    xref = addnodes.pending_xref(
+        "",
+        nodes.Text("shared description"),
+        refdomain="",
+        reftype=SHARED_ROLE,
+        reftarget=key,
+        refexplicit=True,
+        refdoc=env.docname,
+    )
+    return type(paragraph)("", "", nodes.Text("See "), xref, nodes.Text("."))
+
+
+def _item_key(field: str, *parts: nodes.Element) -> str:
+    h = hashlib.blake2b(field.encode(), digest_size=6)
+    for part in parts:
+        _hash_node(h, part)
+    return h.hexdigest()
+
+
+def _hash_node(h: hashlib.blake2b, node: nodes.Node) -> None:
+    if isinstance(node, nodes.Text):
+        h.update(repr(str(node)).encode())
+        return
+    assert isinstance(node, nodes.Element)  # noqa: S101
+    # `refdoc` is the current document, which doesn’t change the rendering
+    attrs = sorted((k, v) for k, v in node.attributes.items() if v and k != "refdoc")
+    h.update(repr((node.tagname, attrs)).encode())
+    for child in node.children:
+        _hash_node(h, child)
+    h.update(b")")
+
+
+def _get_shared(env: BuildEnvironment) -> _SharedItems:
+    if not hasattr(env, "scanpydoc_shared_items"):
+        env.scanpydoc_shared_items = {}  # type: ignore[attr-defined]
+    return env.scanpydoc_shared_items  # type: ignore[attr-defined,no-any-return]
+
+
+def _get_owners(env: BuildEnvironment) -> dict[str, list[str]]:
+    global _owners  # noqa: PLW0603
+    if _owners is None:
+        _owners = {}
+        for docname, (owned, _) in sorted(_get_shared(env).items()):
+            for key in owned:
+                _owners.setdefault(key, []).append(docname)
+    return _owners
+
+
+def _before_read(_app: Sphinx, env: BuildEnvironment, docnames: list[str]) -> None:
+    """Also read documents that link to items whose full rendering might vanish.
+
+    Forget about all documents to be read upfront, so the ones read first
+    don’t link to items in the ones read later.
+    """
+    global _owners  # noqa: PLW0603
+    shared = _get_shared(env)
+    to_read = set(docnames)
+    dropped = set(_dropped)
+    _dropped.clear()
+    for docname in docnames:
+        dropped |= shared.pop(docname, (set(), set()))[0]
+    while dropped:
+        dependents = sorted(
+            docname
+            for docname, (_, referenced) in shared.items()
+            if docname not in to_read and not referenced.isdisjoint(dropped)
+        )
+        dropped = set()
+        for docname in dependents:
+            to_read.add(docname)
+            docnames.append(docname)
+            dropped |= shared.pop(docname)[0]
+    _owners = None
+
+
+def _resolve(
+    app: Sphinx,
+    env: BuildEnvironment,
+    node: addnodes.pending_xref,
+    contnode: nodes.Node,
+) -> nodes.reference | None:
+    if node["reftype"] != SHARED_ROLE:
+        return None
+    if not (owners := _get_owners(env).get(node["reftarget"])):
+        return None
+    owner = node["refdoc"] if node["refdoc"] in owners else owners[0]
+    return make_refnode(
+        app.builder, node["refdoc"], owner, f"item-{node['reftarget']}", contnode
+    )
+
+
+def _purge(_app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+    global _owners  # noqa: PLW0603
+    if (entry := _get_shared(env).pop(docname, None)) is not None:
+        _dropped.update(entry[0])
+        _owners = None
+
+
+def _merge(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    docnames: Iterable[str],
+    other: BuildEnvironment,
+) -> None:
+    global _owners  # noqa: PLW0603
+    ours, theirs = _get_shared(env), _get_shared(other)
+    ours.update((d, theirs[d]) for d in docnames if d in theirs)
+    _owners = None
+
+
+def _visit_details_html(self: HTML5Translator, node: FieldItemsDetails) -> None:
+    self.body.append(self.starttag(node, "details", CLASS="field-items"))
+    self.body.append(f"<summary>{self.encode(node['summary'])}</summary>\n")
+
+
+def _depart_details_html(self: HTML5Translator, _node: FieldItemsDetails) -> None:
+    self.body.append("</details>\n")
+
+
+def _pass(_self: object, _node: FieldItemsDetails) -> None:
+    pass
+
+
+def _get_index(env: BuildEnvironment) -> _Index:
+    if not hasattr(env, "scanpydoc_field_index"):
+        env.scanpydoc_field_index = {}  # type: ignore[attr-defined]
+    return env.scanpydoc_field_index  # type: ignore[attr-defined,no-any-return]
+
+
+def _indexed_object(
+    env: BuildEnvironment | None, location: nodes.Node | None
+) -> _IndexedObject | None:
+    """Get the index entry for the object whose description contains ``location``."""
+    if env is None or not getattr(env.config, "field_items_index", False):
+        return None
+    desc = location
+    while desc is not None and not isinstance(desc, addnodes.desc):
+        desc = desc.parent
+    if desc is None:
+        return None
+    for sig in desc.children:
+        # objects that aren’t indexed by Sphinx (`:no-index:`) have no anchor
+        if isinstance(sig, addnodes.desc_signature) and sig["ids"]:
+            module, fullname = sig.get("module") or "", sig.get("fullname", "")
+            name = f"{module}.{fullname}" if module else fullname
+            objects = _get_index(env).setdefault(env.docname, {})
+            return objects.setdefault(
+                name, dict(module=module, anchor=sig["ids"][0], fields={})
+            )
+    return None
+
+
+def _index_item(
+    indexed: _IndexedObject,
+    field: str,
+    fieldarg: str,
+    item: nodes.definition_list_item,
+) -> None:
+    """Give the item an anchor and add it to the object’s index entry."""
+    anchor = f"{indexed['anchor']}-{field}-{fieldarg}"
+    next(item.findall(nodes.term))["ids"].append(anchor)
+    classifier = next(item.findall(nodes.classifier), None)
+    field_type = "" if classifier is None else classifier.astext()
+    indexed["fields"].setdefault(field, []).append([fieldarg, field_type, anchor])
+
+
+def _purge_index(_app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+    _get_index(env).pop(docname, None)
+
+
+def _merge_index(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    docnames: Iterable[str],
+    other: BuildEnvironment,
+) -> None:
+    ours, theirs = _get_index(env), _get_index(other)
+    ours.update((d, theirs[d]) for d in docnames if d in theirs)
+
+
+def _write_index(app: Sphinx, exception: Exception | None) -> None:
+    """Write the index as one JSON file per module, and a list of them."""
+    if (
+        exception is not None
+        or not app.config.field_items_index
+        or app.builder.format != "html"
+    ):
+        return
+    shards: dict[str, dict[str, _IndexedObject]] = {}
+    for docname, objects in sorted(_get_index(app.env).items()):
+        url = app.builder.get_target_uri(docname)
+        for name, obj in objects.items():
+            shards.setdefault(obj["module"], {})[name] = dict(
+                url=url, anchor=obj["anchor"], fields=obj["fields"]
+            )
+    out_dir = Path(app.outdir) / INDEX_DIR
+    shutil.rmtree(out_dir, ignore_errors=True)  # remove shards of removed modules
+    out_dir.mkdir(parents=True)
+    files = {module: f"{module or '_'}.json" for module in sorted(shards)}
+    for module, objects in shards.items():
+        (out_dir / files[module]).write_text(
+            json.dumps(objects, ensure_ascii=False, separators=(",", ":"))
+        )
+    (out_dir / "index.json").write_text(json.dumps(dict(shards=files)))
+
 
 @_setup_sig
 def setup(app: Sphinx) -> dict[str, Any]:
@@ -120,5 +569,31 @@ def setup(app: Sphinx) -> dict[str, Any]:
         else ft
         for ft in PyObject.doc_field_types
     ]
+    # the config (e.g. `python_use_unqualified_type_names`) might have changed
+    app.connect("builder-inited", _clear_xref_templates)
+
+    app.add_config_value("compact_field_items", default=False, rebuild="env")
+    app.add_config_value("deduplicate_field_items", default=False, rebuild="env")
+    app.connect("env-before-read-docs", _before_read)
+    app.connect("env-purge-doc", _purge)
+    app.connect("env-merge-info", _merge)
+    app.connect("missing-reference", _resolve)
+
+    app.add_config_value(
+        "field_items_collapse_threshold", default=None, rebuild="env", types=(int,)
+    )
+    app.add_node(
+        FieldItemsDetails,
+        html=(_visit_details_html, _depart_details_html),
+        latex=(_pass, _pass),
+        text=(_pass, _pass),
+        man=(_pass, _pass),
+        texinfo=(_pass, _pass),
+    )
+
+    app.add_config_value("field_items_index", default=False, rebuild="env")
+    app.connect("env-purge-doc", _purge_index)
+    app.connect("env-merge-info", _merge_index)
+    app.connect("build-finished", _write_index)
 
     return metadata
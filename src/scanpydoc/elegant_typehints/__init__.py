@@ -4,6 +4,10 @@ The Sphinx extension :mod:`sphinx_autodoc_typehints` adds type annotations to fu
 This extension modifies the created type annotations in four ways:
 
 #. It formats the annotations more simply and in line with e.g. :mod:`numpy`.
+   The config value ``annotation_collapse_threshold`` (default: :data:`None`)
+   collapses literals and unions with more members into a summary
+   like ``Literal[120 options]``, which links to the full definition
+   on a page generated by the HTML builders.
 #. It defines a configuration value ``qualname_overrides`` for ``conf.py``
    that overrides automatically created links. It is used like this::
 
@@ -17,11 +21,38 @@ This extension modifies the created type annotations in four ways:
    The defaults include :class:`anndata.AnnData`, :class:`pandas.DataFrame`,
    :class:`scipy.sparse.spmatrix` and other classes in :mod:`scipy.sparse`.
 
+   Overrides can also be derived automatically from packages’ public API::
+
+       qualname_overrides_from_packages = ["anndata", "pandas"]
+
+   This maps e.g. ``pandas.core.frame.DataFrame`` to ``pandas.DataFrame``,
+   because the latter is the shortest public path
+   (via ``__all__`` or non-underscored names) to that class.
+   The index is cached in the doctree directory per package version.
+   ``qualname_overrides`` and the defaults take precedence over it.
+
+   When overrides change, only documents that looked up changed entries
+   are read again.
+
    It is necessary since :attr:`~definition.__qualname__` does not necessarily match
    the documented location of the function/class.
 
    Once either `sphinx issue 4826`_ or `sphinx-autodoc-typehints issue 38`_ are fixed,
    this part of the functionality will no longer be necessary.
+
+   With ``qualname_overrides_stats = True``, every lookup of an override is counted
+   and timed. At the end of the build, a summary of unused and frequently used
+   overrides is logged and written to ``scanpydoc-override-stats.json``
+   in the doctree directory.
+
+   With ``annotation_format_cache = True``, formatted annotations are cached
+   in the doctree directory, so parallel workers and later builds can reuse them.
+   Entries are invalidated when the relevant configuration, the overrides,
+   the registered formatters, or the versions of Sphinx and its extensions change.
+
+   For classes that need custom formatting (or that are so common that
+   a cheap special case pays off), formatters can be registered
+   using :func:`register_formatter`.
 #. The config value ``annotate_defaults`` (default: :data:`True`) controls if rST code
    like ``(default: `42`)`` is added after the type.
    It sets sphinx-autodoc-typehints’s option ``typehints_defaults`` to ``'braces'``
@@ -41,6 +72,8 @@ This extension modifies the created type annotations in four ways:
                  b : :class:`float`
                      A floating point number
 
+   Names imported only ``if TYPE_CHECKING:`` are linked without importing them.
+
 
 .. _sphinx issue 4826: https://github.com/sphinx-doc/sphinx/issues/4826
 .. _sphinx-autodoc-typehints issue 38: https://github.com/tox-dev/sphinx-autodoc-typehints/issues/38
@@ -49,26 +82,21 @@ This extension modifies the created type annotations in four ways:
 
 from __future__ import annotations
 
+import hashlib
 from types import MappingProxyType
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any
 from pathlib import Path
 from functools import partial
 from collections import ChainMap
 from dataclasses import field, dataclass
+from collections.abc import Mapping
 
 from scanpydoc import metadata, _setup_sig
 from scanpydoc.elegant_typehints._role_mapping import RoleMapping
 
-from .example import (
-    example_func_prose,
-    example_func_tuple,
-    example_func_anonymous_tuple,
-)
-
 
 if TYPE_CHECKING:
-    from typing import Any
-    from collections.abc import Mapping, Callable, Sequence
+    from collections.abc import Callable, Iterator, Sequence
 
     from sphinx.config import Config
     from docutils.nodes import TextElement, reference
@@ -76,17 +104,45 @@ if TYPE_CHECKING:
     from sphinx.application import Sphinx
     from sphinx.environment import BuildEnvironment
 
+    from ._formatting import register_formatter
+    from .example import (
+        example_func_prose,
+        example_func_tuple,
+        example_func_anonymous_tuple,
+    )
+
 
 __all__ = [
     "example_func_anonymous_tuple",
     "example_func_prose",
     "example_func_tuple",
+    "register_formatter",
     "setup",
 ]
 
 
 HERE = Path(__file__).parent.resolve()
 
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    # The examples are only needed when documenting this module
+    if name in {
+        "example_func_anonymous_tuple",
+        "example_func_prose",
+        "example_func_tuple",
+    }:
+        from . import example
+
+        return getattr(example, name)
+    # The formatting machinery is only needed when building or registering formatters
+    if name == "register_formatter":
+        from ._formatting import register_formatter
+
+        return register_formatter
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
 qualname_overrides_default = {
     "anndata.base.AnnData": "anndata.AnnData",
     "anndata.core.anndata.AnnData": "anndata.AnnData",
@@ -101,13 +157,23 @@ qualname_overrides_default = {
 qualname_overrides = ChainMap(
     RoleMapping(),
     RoleMapping.from_user(qualname_overrides_default),  # type: ignore[arg-type]
+    RoleMapping(),  # derived from `qualname_overrides_from_packages`
 )
 
 
-def _init_vars(_app: Sphinx, config: Config) -> None:
-    cast("RoleMapping", qualname_overrides.maps[0]).update_user(
-        config.qualname_overrides
-    )
+def _init_vars(app: Sphinx, config: Config) -> None:
+    # fresh mappings for each app, as they get modified (e.g. by `validate_overrides`)
+    index = RoleMapping()
+    qualname_overrides.maps[:] = [
+        RoleMapping.from_user(config.qualname_overrides),
+        RoleMapping.from_user(qualname_overrides_default),  # type: ignore[arg-type]
+        index,
+    ]
+    if config.qualname_overrides_from_packages:
+        from ._public_index import load_index
+
+        for package in config.qualname_overrides_from_packages:
+            index.update_user(load_index(package, Path(app.doctreedir)))  # type: ignore[arg-type]
     if (
         "sphinx_autodoc_typehints" in config.extensions
         and config.typehints_defaults is None
@@ -115,9 +181,11 @@ def _init_vars(_app: Sphinx, config: Config) -> None:
     ):
         # override default for “typehints_defaults”
         config.typehints_defaults = "braces"
+    # The overrides are in `qualname_overrides` now, only keep a fingerprint
+    config.qualname_overrides = FingerprintedMapping(config.qualname_overrides)
 
 
-@dataclass
+@dataclass(repr=False)
 class PickleableCallable:
     func: Callable[..., Any]
     args: Sequence[Any] = field(default=(), compare=False)
@@ -128,6 +196,53 @@ class PickleableCallable:
     def __getstate__(self) -> dict[str, Any]:
         return dict(func=self.func)
 
+    def __repr__(self) -> str:
+        # Sphinx compares config values between builds via their `str`
+        return f"{type(self).__name__}({self.func.__module__}.{self.func.__qualname__})"
+
+
+class FingerprintedMapping(Mapping[str, Any]):
+    """A config mapping that is pickled as a fingerprint of its contents.
+
+    Sphinx pickles config values with the environment and compares them
+    between builds via their :class:`str`, so a fingerprint suffices.
+    After unpickling, the mapping is empty.
+    """
+
+    data: dict[str, Any]
+    fingerprint: str
+
+    def __init__(self, data: Mapping[str, Any]) -> None:
+        if isinstance(data, FingerprintedMapping):
+            self.data, self.fingerprint = data.data, data.fingerprint
+            return
+        self.data = dict(data)
+        self.fingerprint = hashlib.blake2b(
+            repr(sorted(self.data.items(), key=repr)).encode(), digest_size=16
+        ).hexdigest()
+
+    def __getitem__(self, key: str) -> Any:  # noqa: ANN401
+        return self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FingerprintedMapping):
+            return self.fingerprint == other.fingerprint
+        return isinstance(other, Mapping) and self.data == dict(other.items())
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.fingerprint})"
+
+    def __getstate__(self) -> dict[str, Any]:
+        return dict(data={}, fingerprint=self.fingerprint)
+
 
 # https://www.sphinx-doc.org/en/master/extdev/event_callbacks.html#event-missing-reference
 def _last_resolve(
@@ -139,18 +254,21 @@ def _last_resolve(
     if "sphinx.ext.intersphinx" not in app.extensions:
         return None
 
-    from sphinx.ext.intersphinx import resolve_reference_detect_inventory
+    from ._inventory import resolve_reference
+    from ._override_stats import get_override
 
     if (
-        ref := qualname_overrides.get(
-            (f"{node['refdomain']}:{node['reftype']}", node["reftarget"])
+        ref := get_override(
+            (f"{node['refdomain']}:{node['reftype']}", node["reftarget"]),
+            "missing-reference",
+            docname=node.get("refdoc"),
         )
     ) is None:
         return None
     role, node["reftarget"] = ref
     if role is not None:
         node["refdomain"], node["reftype"] = role.split(":", 1)
-    return resolve_reference_detect_inventory(env, node, contnode)
+    return resolve_reference(env, node, contnode)
 
 
 @_setup_sig
@@ -160,21 +278,46 @@ def setup(app: Sphinx) -> dict[str, Any]:
         msg = "`scanpydoc.elegant_typehints` requires `sphinx.ext.autodoc`."
         raise RuntimeError(msg)
 
-    app.add_config_value("qualname_overrides", default={}, rebuild="html")
+    # Documents using changed overrides are invalidated by `_override_usage`
+    app.add_config_value(
+        "qualname_overrides",
+        default={},
+        rebuild="",
+        types=frozenset({dict, FingerprintedMapping}),
+    )
+    app.add_config_value("qualname_overrides_from_packages", default=(), rebuild="")
     app.add_config_value("annotate_defaults", default=True, rebuild="html")
     app.connect("config-inited", _init_vars)
     # Add 1 to priority to run after sphinx.ext.intersphinx
     app.connect("missing-reference", _last_resolve, priority=501)
 
-    from ._formatting import typehints_formatter
+    from ._inventory import validate_overrides
+
+    # after intersphinx loaded its inventories
+    app.connect("builder-inited", validate_overrides, priority=501)
+
+    from ._formatting import clear_cache, typehints_formatter
+
+    app.connect("builder-inited", clear_cache)
 
     app.config["typehints_formatter"] = PickleableCallable(
         typehints_formatter, kwargs=dict(app=app)
     )
 
-    from . import _return_tuple, _autodoc_patch
+    from . import (
+        _collapse,
+        _return_tuple,
+        _autodoc_patch,
+        _override_stats,
+        _override_usage,
+        _annotation_cache,
+    )
 
     _autodoc_patch.setup(app)
     _return_tuple.setup(app)
+    _override_stats.setup(app)
+    _override_usage.setup(app)
+    _collapse.setup(app)
+    _annotation_cache.setup(app)
 
     return metadata
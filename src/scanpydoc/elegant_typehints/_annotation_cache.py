@@ -0,0 +1,258 @@
+"""Cache formatted annotations on disk, shared by parallel workers and builds.
+
+Enabled by the config value ``annotation_format_cache``.
+Results of :func:`~scanpydoc.elegant_typehints._formatting.typehints_formatter`
+are stored in an SQLite database (in WAL mode, so concurrent workers can
+read while one writes) in the doctree directory,
+keyed by the annotation’s :func:`repr` and a fingerprint of everything
+that influences formatting (config, overrides, registered formatters, versions).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import hashlib
+import sqlite3
+from typing import TYPE_CHECKING
+from pathlib import Path
+from contextlib import contextmanager
+from dataclasses import field, dataclass
+
+from sphinx.util import logging
+
+from ._override_usage import replay, collect
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from sphinx.application import Sphinx
+
+    from ._override_usage import _Lookup
+
+    type _Entry = tuple[str | None, list[_Lookup]]
+    """Formatted annotation (or :data:`None`) and the override lookups made."""
+
+
+logger = logging.getLogger(__name__)
+
+FILENAME = "scanpydoc-annotations.sqlite"
+SCHEMA = """\
+CREATE TABLE IF NOT EXISTS annotations (
+    fingerprint TEXT NOT NULL,
+    annotation TEXT NOT NULL,
+    formatted TEXT,
+    lookups TEXT NOT NULL,
+    PRIMARY KEY (fingerprint, annotation)
+) WITHOUT ROWID
+"""
+
+
+@dataclass
+class Tracked:
+    """Override lookups made while formatting, and if the result can be reused."""
+
+    lookups: dict[_Lookup, None] = field(default_factory=dict)
+    cacheable: bool = True
+
+
+_path: Path | None = None
+"""The database, or :data:`None` if disabled."""
+_fingerprint = ""
+_connection: sqlite3.Connection | None = None
+_entries: dict[str, _Entry] = {}
+"""Entries read or written by this process."""
+_pending: dict[str, _Entry] = {}
+"""Entries not yet written to the database."""
+_tracking: list[Tracked] = []
+_inherited: list[sqlite3.Connection] = []
+"""Connections of the parent process, kept alive so they don’t get closed."""
+
+
+@contextmanager
+def tracking() -> Iterator[Tracked]:
+    """Track lookups and if the result is cacheable (including nested contexts)."""
+    with collect() as lookups:
+        tracked = Tracked(lookups)
+        _tracking.append(tracked)
+        try:
+            yield tracked
+        finally:
+            _tracking.pop()
+            if _tracking and not tracked.cacheable:
+                _tracking[-1].cacheable = False
+
+
+def volatile() -> None:
+    """Mark the result being computed as not cacheable.
+
+    E.g. because it depends on more than the annotation and config,
+    or because computing it has side effects.
+    """
+    if _tracking:
+        _tracking[-1].cacheable = False
+
+
+def cached(annotation: object, compute: Callable[[], str | None]) -> str | None:
+    """Get the formatted ``annotation`` from the cache or :func:`compute` it."""
+    if _path is None or (key := _key(annotation)) is None:
+        return compute()
+    if (entry := _get(key)) is not None:
+        formatted, lookups = entry
+        replay(lookups)
+        return formatted
+    with tracking() as tracked:
+        formatted = compute()
+    if tracked.cacheable:
+        _entries[key] = _pending[key] = formatted, list(tracked.lookups)
+    return formatted
+
+
+def _key(annotation: object) -> str | None:
+    r = repr(annotation)
+    if " at 0x" in r:  # contains an object ID, so isn’t stable
+        return None
+    cls = type(annotation)
+    return f"{cls.__module__}.{cls.__qualname__}:{r}"
+
+
+def _get(key: str) -> _Entry | None:
+    if (entry := _entries.get(key)) is not None:
+        return entry
+    try:
+        row = (
+            _connect()
+            .execute(
+                "SELECT formatted, lookups FROM annotations"
+                " WHERE fingerprint = ? AND annotation = ?",
+                (_fingerprint, key),
+            )
+            .fetchone()
+        )
+    except sqlite3.Error as e:
+        _disable(e)
+        return None
+    if row is None:
+        return None
+    formatted, lookups = row
+    entry = _entries[key] = (
+        formatted,
+        [((role, name), site) for (role, name), site in json.loads(lookups)],
+    )
+    return entry
+
+
+def _connect() -> sqlite3.Connection:
+    global _connection  # noqa: PLW0603
+    if _connection is None:
+        assert _path is not None  # noqa: S101
+        _connection = sqlite3.connect(_path, timeout=60)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("PRAGMA synchronous=NORMAL")
+        _connection.execute(SCHEMA)
+    return _connection
+
+
+def flush(_app: Sphinx | None = None, *_args: object) -> None:
+    """Write pending entries to the database."""
+    if _path is None or not _pending:
+        return
+    rows = [
+        (_fingerprint, key, formatted, json.dumps(lookups))
+        for key, (formatted, lookups) in _pending.items()
+    ]
+    _pending.clear()
+    try:
+        with _connect() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO annotations VALUES (?, ?, ?, ?)", rows
+            )
+    except sqlite3.Error as e:
+        _disable(e)
+
+
+def _disable(e: sqlite3.Error) -> None:
+    global _path  # noqa: PLW0603
+    logger.warning("Disabling annotation_format_cache: %s", e)
+    _path = None
+
+
+def _fingerprint_config(app: Sphinx) -> str:
+    import sphinx
+    import sphinx_autodoc_typehints
+
+    from scanpydoc import metadata
+
+    from ._formatting import _format_class
+    from ._override_usage import _fingerprint as overrides_fingerprint
+
+    relevant = {
+        name: app.config[name]
+        for name in (
+            "typehints_fully_qualified",
+            "always_use_bars_union",
+            "simplify_optional_unions",
+            "annotation_collapse_threshold",
+        )
+        if name in app.config
+    }
+    formatters = sorted(
+        f"{cls.__module__}.{cls.__qualname__}={func.__module__}.{func.__qualname__}"
+        for cls, func in _format_class.registry.items()
+    )
+    versions = (
+        sys.version_info[:2],
+        sphinx.__version__,
+        sphinx_autodoc_typehints.__version__,
+        metadata["version"],
+    )
+    return hashlib.blake2b(
+        repr((relevant, overrides_fingerprint(), formatters, versions)).encode(),
+        digest_size=16,
+    ).hexdigest()
+
+
+def _init_cache(app: Sphinx) -> None:
+    global _path, _fingerprint, _connection  # noqa: PLW0603
+    if _connection is not None:
+        _connection.close()
+    _connection = None
+    _entries.clear()
+    _pending.clear()
+    if not app.config.annotation_format_cache:
+        _path = None
+        return
+    _path = Path(app.doctreedir) / FILENAME
+    _path.parent.mkdir(parents=True, exist_ok=True)
+    _fingerprint = _fingerprint_config(app)
+    try:
+        with _connect() as connection:  # entries from other versions won’t be used
+            connection.execute(
+                "DELETE FROM annotations WHERE fingerprint != ?", (_fingerprint,)
+            )
+    except sqlite3.Error as e:
+        _disable(e)
+
+
+def _after_fork() -> None:
+    """Don’t share connections between processes, workers open their own."""
+    global _connection  # noqa: PLW0603
+    if _connection is not None:
+        _inherited.append(_connection)
+        _connection = None
+    _pending.clear()  # the parent writes those
+
+
+if hasattr(os, "register_at_fork"):  # pragma: no branch
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def setup(app: Sphinx) -> None:
+    app.add_config_value("annotation_format_cache", default=False, rebuild="")
+    # after overrides were finalized by `validate_overrides`
+    app.connect("builder-inited", _init_cache, priority=900)
+    # workers write their results after each document, so they get shared
+    app.connect("doctree-read", flush)
+    app.connect("build-finished", flush)
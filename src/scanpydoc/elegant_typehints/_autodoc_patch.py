@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+from time import perf_counter
 from typing import TYPE_CHECKING
 from functools import wraps
 
 from sphinx.ext.autodoc import ClassDocumenter
 
-from . import qualname_overrides
+from . import _override_stats, _override_usage, qualname_overrides
 
 
 if TYPE_CHECKING:
@@ -25,7 +26,15 @@ def add_directive_header(self: ClassDocumenter, sig: str) -> None:
         if isinstance(self.object, type) and issubclass(self.object, BaseException)
         else ("py:class", "py:class")
     )
+    text = "\n".join(lines)
+    _override_usage.record_header(text)
+    track = _override_stats.enabled()
+    start = perf_counter()
+    used: list[str] = []
     for (old_role, old_name), (new_role, new_name) in qualname_overrides.items():
+        if old_name.rsplit(".", 1)[-1] not in text:
+            continue  # cheap check, as there can be many overrides
+        before = lines.data.copy() if track else None
         role = inferred_role if new_role is None else new_role
         # Currently, autodoc doesn’t link to bases using :exc:
         lines.replace(
@@ -33,15 +42,17 @@ def add_directive_header(self: ClassDocumenter, sig: str) -> None:
         )
         # But maybe in the future it will
         lines.replace(f":{role}:`{old_name}`", f":{role}:`{new_name}`")
-        if any("." not in name for name in (old_name, new_name)):
-            continue  # pragma: no cover
-        old_mod, old_cls = old_name.rsplit(".", 1)
-        new_mod, new_cls = new_name.rsplit(".", 1)
-        replace_multi_suffix(
-            lines,
-            (f".. {direc}:: {old_cls}", f"   :module: {old_mod}"),
-            (f".. {direc}:: {new_cls}", f"   :module: {new_mod}"),
-        )
+        if all("." in name for name in (old_name, new_name)):
+            old_mod, old_cls = old_name.rsplit(".", 1)
+            new_mod, new_cls = new_name.rsplit(".", 1)
+            replace_multi_suffix(
+                lines,
+                (f".. {direc}:: {old_cls}", f"   :module: {old_mod}"),
+                (f".. {direc}:: {new_cls}", f"   :module: {new_mod}"),
+            )
+        if before is not None and lines.data != before:
+            used.append(old_name)
+    _override_stats.record("autodoc-header", used, perf_counter() - start)
 
 
 def replace_multi_suffix(
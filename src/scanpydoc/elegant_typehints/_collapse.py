@@ -0,0 +1,128 @@
+"""Collapse large :data:`~typing.Literal` and union annotations.
+
+With ``annotation_collapse_threshold = n``, literals and unions
+with more than ``n`` members are rendered as a short summary
+that links to their full definition on a shared, generated page.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from html import escape
+from types import UnionType
+from typing import TYPE_CHECKING, Union, Literal, get_args, get_origin
+
+from docutils import nodes
+from sphinx.roles import XRefRole
+
+from . import _annotation_cache
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from sphinx.config import Config
+    from sphinx.addnodes import pending_xref
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+
+    type _Definitions = dict[str, tuple[str, list[str]]]
+    """Label and members by anchor."""
+
+
+PAGE = "scanpydoc-annotations"
+ROLE = "scanpydoc-annotation"
+
+COLLAPSIBLE = frozenset({type(Literal[0]), type(Union[int, str]), UnionType})  # noqa: UP007
+"""Annotation classes that can be collapsed."""
+
+
+def collapse(annotation: object, config: Config, app: Sphinx | None) -> str | None:
+    """Summarize ``annotation`` if it has more members than the threshold."""
+    threshold: int | None = getattr(config, "annotation_collapse_threshold", None)
+    if app is None or threshold is None:
+        return None
+    args = get_args(annotation)
+    if len(args) <= threshold:
+        return None
+    name = "Literal" if get_origin(annotation) is Literal else "Union"
+    members = [repr(arg) if name == "Literal" else _type_name(arg) for arg in args]
+    label = f"{name}[{len(args)} options]"
+    digest = hashlib.blake2b(f"{name}{members}".encode(), digest_size=8).hexdigest()
+    anchor = f"ann-{digest}"
+    definitions = _get_definitions(app.env)
+    definitions.setdefault(app.env.docname, {})[anchor] = label, members
+    _annotation_cache.volatile()  # the definition needs to be recorded every time
+    return f":{ROLE}:`{label} <{anchor}>`"
+
+
+def _type_name(arg: object) -> str:
+    if arg is type(None):
+        return "None"
+    if isinstance(arg, type):
+        return f"{arg.__module__}.{arg.__qualname__}"
+    return repr(arg)
+
+
+def _get_definitions(env: BuildEnvironment) -> dict[str, _Definitions]:
+    if not hasattr(env, "scanpydoc_collapsed_annotations"):
+        env.scanpydoc_collapsed_annotations = {}  # type: ignore[attr-defined]
+    return env.scanpydoc_collapsed_annotations  # type: ignore[attr-defined,no-any-return]
+
+
+def _resolve(
+    app: Sphinx, _env: BuildEnvironment, node: pending_xref, contnode: nodes.TextElement
+) -> nodes.Element | None:
+    if node["reftype"] != ROLE:
+        return None
+    if app.builder.format != "html":
+        return contnode  # no page to link to
+    uri = app.builder.get_relative_uri(node["refdoc"], PAGE)
+    return nodes.reference(
+        "", "", contnode, internal=True, refuri=f"{uri}#{node['reftarget']}"
+    )
+
+
+def _collect_pages(app: Sphinx) -> Iterator[tuple[str, dict[str, str], str]]:
+    definitions = {
+        anchor: definition
+        for doc_definitions in _get_definitions(app.env).values()
+        for anchor, definition in doc_definitions.items()
+    }
+    if not definitions:
+        return
+    body = "".join(_render(definitions))
+    yield PAGE, dict(title="Annotations", body=body), "page.html"
+
+
+def _render(definitions: _Definitions) -> Iterable[str]:
+    yield "<h1>Annotations</h1>\n"
+    for anchor, (label, members) in sorted(definitions.items(), key=lambda d: d[1]):
+        yield f'<section id="{anchor}">\n<h2>{escape(label)}</h2>\n<ul>\n'
+        yield from (f"<li><code>{escape(m)}</code></li>\n" for m in members)
+        yield "</ul>\n</section>\n"
+
+
+def _purge(_app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+    _get_definitions(env).pop(docname, None)
+
+
+def _merge(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    docnames: Iterable[str],
+    other: BuildEnvironment,
+) -> None:
+    ours, theirs = _get_definitions(env), _get_definitions(other)
+    ours.update((d, theirs[d]) for d in docnames if d in theirs)
+
+
+def setup(app: Sphinx) -> None:
+    app.add_config_value(
+        "annotation_collapse_threshold", default=None, rebuild="env", types=(int,)
+    )
+    app.add_role(ROLE, XRefRole())
+    app.connect("missing-reference", _resolve)
+    app.connect("html-collect-pages", _collect_pages)
+    app.connect("env-purge-doc", _purge)
+    app.connect("env-merge-info", _merge)
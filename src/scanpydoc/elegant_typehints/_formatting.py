@@ -1,24 +1,39 @@
 from __future__ import annotations
 
 from types import GenericAlias
-from typing import TYPE_CHECKING, TypeAliasType, cast, get_args, get_origin
+from typing import TYPE_CHECKING, TypeAliasType, get_args, overload, get_origin
+from functools import singledispatch
 
 from docutils import nodes
 from sphinx.addnodes import pending_xref
-from sphinx.ext.intersphinx import resolve_reference_detect_inventory
-from sphinx_autodoc_typehints import format_annotation
 
-from scanpydoc import elegant_typehints
 from scanpydoc._types import _GenericAlias
 
+from . import _annotation_cache
+from ._collapse import COLLAPSIBLE
+from ._override_stats import get_override
+from ._override_usage import replay
+
 
 if TYPE_CHECKING:
     from typing import Any
-    from collections.abc import Sequence
+    from collections.abc import Callable, Hashable, Sequence
 
     from sphinx.config import Config
     from sphinx.application import Sphinx
 
+    from ._override_usage import _Lookup
+
+    type ClassFormatter = Callable[[type, Sequence[Any] | None, Config], str | None]
+    type _Formatted = tuple[str, tuple[_Lookup, ...]]
+    """Formatted reStructuredText and the override lookups it’s based on."""
+
+
+_formatted_args: dict[Hashable, _Formatted] = {}
+"""Formatted generic argument lists, see :func:`_cache_key`."""
+_formatted_arg: dict[Hashable, _Formatted] = {}
+"""Formatted generic arguments, see :func:`_cache_key`."""
+
 
 def typehints_formatter(
     annotation: object, config: Config, app: Sphinx | None = None
@@ -39,27 +54,108 @@ def typehints_formatter(
     -------
     reStructuredText describing the type
     """
-    if isinstance(annotation, TypeAliasType):
-        if ref := _link_or_expand_alias(annotation, app=app):
-            return ref
-        return format_annotation(annotation.__value__, config)
+    return _annotation_cache.cached(
+        annotation, lambda: _format_annotation(annotation, config, app)
+    )
+
+
+@overload
+def register_formatter[F: ClassFormatter](
+    cls: type, func: None = None
+) -> Callable[[F], F]: ...
+@overload
+def register_formatter[F: ClassFormatter](cls: type, func: F) -> F: ...
+def register_formatter[F: ClassFormatter](
+    cls: type, func: F | None = None
+) -> F | Callable[[F], F]:
+    """Register a formatter for annotations that are (subclasses of) ``cls``.
+
+    Formatters are looked up by the annotation class’s MRO
+    (like :func:`functools.singledispatch`), which is only done once per class.
+    They are called with the class, its generic arguments or :data:`None`,
+    and the Sphinx config, and return reStructuredText or :data:`None`
+    to let :mod:`sphinx_autodoc_typehints` format the annotation.
+    Can be used as a decorator::
+
+        @register_formatter(MyArray)
+        def fmt_my_array(cls, args, config):
+            return ":class:`mypkg.MyArray`"
 
-    if isinstance(annotation, type) and annotation.__module__ == "builtins":
-        return None
+    Arguments
+    ---------
+    cls
+        The class to register ``func`` for.
+    func
+        The formatter.
+
+    Returns
+    -------
+    ``func``, or a decorator if ``func`` is omitted
+    """
+    return _format_class.register(cls, func)  # type: ignore[return-value]
+
+
+@singledispatch
+def _format_annotation(
+    annotation: object,  # noqa: ARG001
+    config: Config,  # noqa: ARG001
+    app: Sphinx | None,  # noqa: ARG001
+) -> str | None:
+    """Format an annotation depending on its kind, e.g. class or generic alias."""
+    return None  # e.g. `typing` special forms
 
-    if isinstance(annotation, GenericAlias | _GenericAlias):
-        args = get_args(annotation)
-        annotation = cast("type", get_origin(annotation))
-    else:
-        args = None
-    annotation_cls = annotation if isinstance(annotation, type) else type(annotation)
-    if annotation_cls.__module__ in {"typing", "types"}:
-        return None
 
-    if isinstance(annotation, type):
-        return _fmt_type(annotation, args, config)
+@_format_annotation.register(TypeAliasType)
+def _format_alias(
+    annotation: TypeAliasType, config: Config, app: Sphinx | None
+) -> str | None:
+    if ref := _link_or_expand_alias(annotation, app=app):
+        return ref
+    from sphinx_autodoc_typehints import format_annotation
+
+    return format_annotation(annotation.__value__, config)
 
-    return None  # pragma: no cover
+
+@_format_annotation.register(type)
+def _format_type(
+    annotation: type,
+    config: Config,
+    app: Sphinx | None,  # noqa: ARG001
+) -> str | None:
+    return _format_class.dispatch(annotation)(annotation, None, config)
+
+
+@_format_annotation.register(GenericAlias)
+@_format_annotation.register(_GenericAlias)
+def _format_generic(
+    annotation: object,
+    config: Config,
+    app: Sphinx | None,  # noqa: ARG001
+) -> str | None:
+    origin = get_origin(annotation)
+    if not isinstance(origin, type):
+        return None  # e.g. `Union`
+    return _format_class.dispatch(origin)(origin, get_args(annotation), config)
+
+
+def _format_collapsible(
+    annotation: object, config: Config, app: Sphinx | None
+) -> str | None:
+    from ._collapse import collapse
+
+    return collapse(annotation, config, app)
+
+
+for _cls in COLLAPSIBLE:
+    _format_annotation.register(_cls, _format_collapsible)
+
+
+@singledispatch
+def _format_class(cls: type, args: Sequence[Any] | None, config: Config) -> str | None:
+    """Format a class, possibly with generic arguments."""
+    if cls.__module__ in {"builtins", "typing", "types"}:
+        return None
+    return _fmt_type(cls, args, config)
 
 
 def _link_or_expand_alias(
@@ -68,29 +164,29 @@ def _link_or_expand_alias(
     """Eagerly try to resolve the reference and return it if it does."""
     if app is None or "sphinx.ext.intersphinx" not in app.extensions:
         return None
+    _annotation_cache.volatile()  # depends on the loaded inventories
     role, qualname = "py:type", f"{annotation.__module__}.{annotation.__name__}"
-    if override := elegant_typehints.qualname_overrides.get((role, qualname)):
+    if override := get_override((role, qualname), "typealias"):
         role = override[0] or "py:type"
         qualname = override[1]
         return f":{role}:`{qualname}`"
 
     from . import _last_resolve
+    from ._inventory import resolve_reference
 
     domain, typ = role.split(":", 1)
     xref = pending_xref(refdomain=domain, reftype=typ, reftarget=qualname)
     contnode = nodes.TextElement()
-    if _last_resolve(
-        app, app.env, xref, contnode
-    ) or resolve_reference_detect_inventory(app.env, xref, contnode):
+    if _last_resolve(app, app.env, xref, contnode) or resolve_reference(
+        app.env, xref, contnode
+    ):
         return f":{role}:`{qualname}`"
     return None
 
 
 def _fmt_type(cls: type, args: Sequence[Any] | None, config: Config) -> str | None:
     full_name = f"{cls.__module__}.{cls.__qualname__}"
-    if (
-        override := elegant_typehints.qualname_overrides.get((None, full_name))
-    ) is None:
+    if (override := get_override((None, full_name), "type")) is None:
         return None
 
     role, qualname = override
@@ -101,9 +197,56 @@ def _fmt_type(cls: type, args: Sequence[Any] | None, config: Config) -> str | No
     tilde = "" if config.typehints_fully_qualified else "~"
     if role is None:
         role = "py:exc" if issubclass(cls, BaseException) else "py:class"
-    if args is None:
-        formatted_args = ""
-    else:
-        formatted_args = ", ".join(format_annotation(arg, config) for arg in args)
-        formatted_args = rf"\ \[{formatted_args}]"
+    formatted_args = "" if args is None else rf"\ \[{_fmt_args(args, config)}]"
     return f":{role}:`{tilde}{qualname}`{formatted_args}"
+
+
+def _fmt_args(args: Sequence[Any], config: Config) -> str:
+    """Format generic arguments, reusing earlier results."""
+    key = _cache_key(tuple(args), config)
+    if key is not None and (cached := _formatted_args.get(key)) is not None:
+        formatted, lookups = cached
+        replay(lookups)
+        return formatted
+    with _annotation_cache.tracking() as tracked:
+        formatted = ", ".join(_fmt_arg(arg, config) for arg in args)
+    if key is not None and tracked.cacheable:
+        _formatted_args[key] = formatted, tuple(tracked.lookups)
+    return formatted
+
+
+def _fmt_arg(arg: object, config: Config) -> str:
+    """Format a single generic argument, reusing earlier results.
+
+    Arguments shared between generics (e.g. ``AnnData`` in ``Mapping[str, AnnData]``
+    and ``Sequence[AnnData]``) are therefore only formatted once.
+    """
+    from sphinx_autodoc_typehints import format_annotation
+
+    key = _cache_key(arg, config)
+    if key is not None and (cached := _formatted_arg.get(key)) is not None:
+        formatted, lookups = cached
+        replay(lookups)
+        return formatted
+    with _annotation_cache.tracking() as tracked:
+        formatted = format_annotation(arg, config)
+    if key is not None and tracked.cacheable:
+        _formatted_arg[key] = formatted, tuple(tracked.lookups)
+    return formatted
+
+
+def _cache_key(obj: object, config: Config) -> Hashable | None:
+    # `repr` tells apart equal annotations that format differently,
+    # e.g. `int | str` and `str | int`, or `Literal[1]` and `Literal[True]`
+    key = (obj, repr(obj), config.typehints_fully_qualified)
+    try:
+        hash(key)
+    except TypeError:  # e.g. `Callable[[int], str]` has a list as argument
+        return None
+    return key
+
+
+def clear_cache(_app: Sphinx | None = None) -> None:
+    """Forget formatted arguments, e.g. because ``qualname_overrides`` changed."""
+    _formatted_args.clear()
+    _formatted_arg.clear()
@@ -0,0 +1,152 @@
+"""Check and resolve ``qualname_overrides`` using intersphinx inventories."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from itertools import chain
+
+from sphinx.util import logging
+
+
+if TYPE_CHECKING:
+    from docutils.nodes import TextElement, reference
+    from sphinx.domains import Domain
+    from sphinx.addnodes import pending_xref
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+    from sphinx.util.typing import Inventory
+
+    from ._role_mapping import RoleMapping
+
+
+logger = logging.getLogger(__name__)
+
+_known_names: tuple[tuple[int, ...], frozenset[str]] = ((), frozenset())
+"""Fingerprint of the main inventory and all names in it."""
+
+
+def validate_overrides(app: Sphinx) -> None:
+    """Infer roles of override targets from the inventories and report dead ones.
+
+    Runs once intersphinx has loaded its inventories.
+    Overrides without a role get the role of the object type
+    that their target is listed under in the inventories,
+    so later lookups and resolutions use that role directly.
+    """
+    if "sphinx.ext.intersphinx" not in app.extensions:
+        return
+
+    from sphinx.ext.intersphinx import InventoryAdapter
+
+    from . import qualname_overrides
+
+    adapter = InventoryAdapter(app.env)
+    if not adapter.main_inventory:
+        return  # e.g. offline: we can’t tell if overrides are dead
+    # build this once before parallel workers are forked
+    known_names(app.env)
+
+    py = app.env.get_domain("py")
+    n_total = n_inferred = 0
+    dead: list[str] = []
+    for mapping in qualname_overrides.maps:
+        rm: RoleMapping = mapping  # type: ignore[assignment]
+        for key, (role, target) in rm.data.items():
+            n_total += 1
+            if role is None:
+                if (
+                    inferred := _infer_role(adapter.main_inventory, py, target)
+                ) is None:
+                    dead.append(target)
+                else:
+                    rm.data[key] = inferred, target
+                    n_inferred += 1
+            elif not _exists(app, adapter.main_inventory, role, target):
+                dead.append(target)
+
+    logger.verbose(
+        "qualname_overrides: inferred roles of %d of %d targets", n_inferred, n_total
+    )
+    if dead:
+        logger.verbose(
+            "qualname_overrides: %d of %d targets not found in intersphinx inventories",
+            len(dead),
+            n_total,
+        )
+        logger.verbose(
+            "qualname_overrides targets not in inventories "
+            "(they might be documented locally): %s",
+            ", ".join(sorted(dead)),
+        )
+
+
+def _infer_role(inventory: Inventory, py: Domain, target: str) -> str | None:
+    for objtype, info in py.object_types.items():
+        if target in inventory.get(f"py:{objtype}", {}):
+            return f"py:{info.roles[0]}"
+    return None
+
+
+def _exists(app: Sphinx, inventory: Inventory, role: str, target: str) -> bool:
+    if role == "doc":
+        return _in_inventory(app, inventory, ["std:doc"], target)
+    domain_name, typ = role.split(":", 1)
+    domain = app.env.get_domain(domain_name)
+    objtypes = [f"{domain_name}:{o}" for o in domain.objtypes_for_role(typ) or ()]
+    return _in_inventory(app, inventory, objtypes, target)
+
+
+def _in_inventory(
+    app: Sphinx, inventory: Inventory, objtypes: list[str], target: str
+) -> bool:
+    from sphinx.ext.intersphinx import InventoryAdapter
+
+    if any(target in inventory.get(objtype, {}) for objtype in objtypes):
+        return True
+    # maybe a reference to a named inventory, like `pandas:reference/aliases`
+    inv_name, _, new_target = target.partition(":")
+    named = InventoryAdapter(app.env).named_inventory.get(inv_name)
+    return (
+        bool(new_target)
+        and named is not None
+        and any(new_target in named.get(objtype, {}) for objtype in objtypes)
+    )
+
+
+def known_names(env: BuildEnvironment) -> frozenset[str]:
+    """Get all names in the main inventory, regardless of object type.
+
+    This is only rebuilt when the inventory changes,
+    so it’s a cheap way to rule out names before resolving them.
+    """
+    from sphinx.ext.intersphinx import InventoryAdapter
+
+    global _known_names  # noqa: PLW0603
+    inventory = InventoryAdapter(env).main_inventory
+    key = (id(inventory), *(len(entries) for entries in inventory.values()))
+    if _known_names[0] != key:
+        _known_names = key, frozenset(chain.from_iterable(inventory.values()))
+    return _known_names[1]
+
+
+def resolve_reference(
+    env: BuildEnvironment, node: pending_xref, contnode: TextElement
+) -> reference | None:
+    """Resolve a reference via intersphinx, skipping names that can’t be found."""
+    from sphinx.ext.intersphinx import resolve_reference_detect_inventory
+
+    if not _maybe_known(env, node):
+        return None
+    return resolve_reference_detect_inventory(env, node, contnode)
+
+
+def _maybe_known(env: BuildEnvironment, node: pending_xref) -> bool:
+    target: str = node["reftarget"]
+    if ":" in target or node.get("refdomain") != "py":
+        # named inventory or e.g. case insensitive `std:term`
+        return True
+    names = known_names(env)
+    if target in names:
+        return True
+    full_name = env.get_domain("py").get_full_qualified_name(node)
+    return full_name is not None and full_name in names
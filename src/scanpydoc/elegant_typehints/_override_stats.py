@@ -0,0 +1,206 @@
+"""Count how often ``qualname_overrides`` are used and how long that takes.
+
+Enabled by the config value ``qualname_overrides_stats``.
+Counts are kept per document in the environment,
+so parallel reads can be merged and unchanged documents keep theirs.
+References are resolved after the environment has been pickled,
+so counts for resolving them are saved to a separate file.
+"""
+
+from __future__ import annotations
+
+import json
+from time import perf_counter
+from typing import TYPE_CHECKING
+from pathlib import Path
+from collections import Counter
+
+from sphinx.util import logging
+
+from . import _override_usage
+
+
+if TYPE_CHECKING:
+    from typing import Any
+    from collections.abc import Iterable
+
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+
+    type _Stats = dict[str, dict[str, list[float]]]
+    """Per site: [calls, hits, seconds], per override: [hits, seconds]."""
+    type _DocStats = dict[str, _Stats]
+    """Stats per phase (read or resolve) of a document."""
+
+
+logger = logging.getLogger(__name__)
+
+N_HOTTEST = 10
+RESOLVE_FILENAME = "scanpydoc-override-stats-resolve.json"
+
+_env: BuildEnvironment | None = None
+"""The environment stats are recorded in, or :data:`None` if disabled."""
+_resolved: set[str] = set()
+"""Documents whose references have been resolved in this build."""
+
+
+def get_override(
+    key: tuple[str | None, str], site: str, *, docname: str | None = None
+) -> tuple[str | None, str] | None:
+    """Look up an override, recording the lookup (and its stats if enabled)."""
+    from . import qualname_overrides
+
+    if _env is None:
+        override = qualname_overrides.get(key)
+    else:
+        start = perf_counter()
+        override = qualname_overrides.get(key)
+        names = () if override is None else (key[1],)
+        record(site, names, perf_counter() - start, docname=docname)
+    _override_usage.record(key, override, docname=docname)
+    _override_usage.track(key, site)
+    return override
+
+
+def enabled() -> bool:
+    """Check if stats are being recorded."""
+    return _env is not None
+
+
+def record(
+    site: str, names: Iterable[str], seconds: float, *, docname: str | None = None
+) -> None:
+    """Record a call at ``site`` that used the overrides for ``names``.
+
+    If ``docname`` is given, the call is counted for resolving that document,
+    else for reading the current document.
+    """
+    if _env is None:
+        return
+    stats = _phase_stats(_env, docname)
+    names = list(names)
+    site_stats = stats["sites"].setdefault(site, [0, 0, 0.0])
+    site_stats[0] += 1
+    site_stats[1] += bool(names)
+    site_stats[2] += seconds
+    for name in names:
+        name_stats = stats["names"].setdefault(name, [0, 0.0])
+        name_stats[0] += 1
+        name_stats[1] += seconds / len(names)
+
+
+def _phase_stats(env: BuildEnvironment, docname: str | None) -> _Stats:
+    all_stats: dict[str, _DocStats] = env.scanpydoc_override_stats  # type: ignore[attr-defined]
+    if docname is None:
+        doc_stats = all_stats.setdefault(env.docname, {})
+        return doc_stats.setdefault("read", dict(sites={}, names={}))
+    doc_stats = all_stats.setdefault(docname, {})
+    if docname not in _resolved:  # resolving again, e.g. because of other docs
+        _resolved.add(docname)
+        doc_stats["resolve"] = dict(sites={}, names={})
+    return doc_stats["resolve"]
+
+
+def _init_stats(app: Sphinx) -> None:
+    global _env  # noqa: PLW0603
+    _resolved.clear()
+    if not app.config.qualname_overrides_stats:
+        _env = None
+        if hasattr(app.env, "scanpydoc_override_stats"):
+            del app.env.scanpydoc_override_stats
+        return
+    _env = app.env
+    if not hasattr(app.env, "scanpydoc_override_stats"):
+        app.env.scanpydoc_override_stats = {}  # type: ignore[attr-defined]
+    all_stats: dict[str, _DocStats] = app.env.scanpydoc_override_stats  # type: ignore[attr-defined]
+    try:
+        resolved = json.loads((Path(app.doctreedir) / RESOLVE_FILENAME).read_text())
+    except (OSError, ValueError):
+        return
+    # documents that get read again are purged, and their stats recorded anew
+    for docname, stats in resolved.items():
+        if docname in app.env.all_docs:
+            all_stats.setdefault(docname, {})["resolve"] = stats
+
+
+def _purge_stats(_app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+    getattr(env, "scanpydoc_override_stats", {}).pop(docname, None)
+
+
+def _merge_stats(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    docnames: Iterable[str],
+    other: BuildEnvironment,
+) -> None:
+    if not hasattr(env, "scanpydoc_override_stats"):
+        return
+    ours: dict[str, _DocStats] = env.scanpydoc_override_stats
+    theirs: dict[str, _DocStats] = getattr(other, "scanpydoc_override_stats", {})
+    ours.update((d, theirs[d]) for d in docnames if d in theirs)
+
+
+def summarize(env: BuildEnvironment) -> dict[str, Any]:
+    """Summarize the recorded stats over all documents."""
+    from . import qualname_overrides
+
+    sites: dict[str, list[float]] = {}
+    hits: Counter[str] = Counter()
+    seconds: dict[str, float] = {}
+    all_stats: dict[str, _DocStats] = getattr(env, "scanpydoc_override_stats", {})
+    for doc_stats in all_stats.values():
+        for stats in doc_stats.values():
+            for site, site_stats in stats["sites"].items():
+                total = sites.setdefault(site, [0, 0, 0.0])
+                for i, v in enumerate(site_stats):
+                    total[i] += v
+            for name, (n, s) in stats["names"].items():
+                hits[name] += int(n)
+                seconds[name] = seconds.get(name, 0.0) + s
+    names = {name for _, name in qualname_overrides}
+    return dict(
+        total_seconds=sum(s for _, _, s in sites.values()),
+        sites={
+            site: dict(calls=int(c), hits=int(h), seconds=s)
+            for site, (c, h, s) in sorted(sites.items())
+        },
+        hottest=[
+            dict(name=name, hits=n, seconds=seconds[name])
+            for name, n in hits.most_common(N_HOTTEST)
+        ],
+        unused=sorted(names - hits.keys()),
+        n_overrides=len(names),
+    )
+
+
+def _report_stats(app: Sphinx, exception: Exception | None) -> None:
+    if exception is not None or _env is None:
+        return
+    all_stats: dict[str, _DocStats] = app.env.scanpydoc_override_stats  # type: ignore[attr-defined]
+    resolved = {d: s["resolve"] for d, s in all_stats.items() if "resolve" in s}
+    (Path(app.doctreedir) / RESOLVE_FILENAME).write_text(json.dumps(resolved))
+    summary = summarize(app.env)
+    path = Path(app.doctreedir) / "scanpydoc-override-stats.json"
+    path.write_text(json.dumps(summary, indent=2))
+    unused, n_overrides = summary["unused"], summary["n_overrides"]
+    logger.info(
+        "qualname_overrides: %d of %d used, %.3f s spent handling them (see %s)",
+        n_overrides - len(unused),
+        n_overrides,
+        summary["total_seconds"],
+        path,
+    )
+    for entry in summary["hottest"]:
+        logger.verbose(
+            "qualname_overrides: %(name)s used %(hits)d times (%(seconds).6f s)", entry
+        )
+    if unused:
+        logger.verbose("qualname_overrides never used: %s", ", ".join(unused))
+
+
+def setup(app: Sphinx) -> None:
+    app.add_config_value("qualname_overrides_stats", default=False, rebuild="")
+    app.connect("builder-inited", _init_stats)
+    app.connect("env-purge-doc", _purge_stats)
+    app.connect("env-merge-info", _merge_stats)
+    app.connect("build-finished", _report_stats)
@@ -0,0 +1,204 @@
+"""Track which documents use which ``qualname_overrides``.
+
+Every lookup (hit or miss) is recorded per document with a checksum of its result,
+so when the overrides change, only the documents whose lookups
+would now have a different result are marked as outdated.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+import hashlib
+from typing import TYPE_CHECKING
+from contextlib import contextmanager
+
+from sphinx.util import logging
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from docutils import nodes
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+
+    type _Key = tuple[str | None, str]
+    type _Usage = dict[_Key, int]
+    """Checksum of the lookup result by override key."""
+    type _Lookup = tuple[_Key, str]
+    """Override key and site of a lookup."""
+
+
+logger = logging.getLogger(__name__)
+
+re_header_name = re.compile(r"`~?([\w.]+)`|:module: ([\w.]+)|\.\. py:\w+:: (\w+)")
+
+_env: BuildEnvironment | None = None
+"""The environment usage is recorded in."""
+_collecting: list[dict[_Lookup, None]] = []
+"""Lookups made in each active :func:`collect` context."""
+_namespaces: set[str] = set()
+"""Modules and classes containing overridden names, see :func:`_record_xrefs`."""
+
+
+def record(
+    key: _Key, result: tuple[str | None, str] | None, *, docname: str | None = None
+) -> None:
+    """Record that ``docname`` (default: the current document) looked up ``key``."""
+    if _env is None:
+        return
+    usage: dict[str, _Usage] = _env.scanpydoc_override_usage  # type: ignore[attr-defined]
+    doc_usage = usage.setdefault(_env.docname if docname is None else docname, {})
+    if key not in doc_usage:
+        doc_usage[key] = _checksum(result)
+
+
+def record_header(text: str) -> None:
+    """Record all names in an autodoc directive header as looked up."""
+    from . import qualname_overrides
+
+    module = None
+    for target, mod, cls in re_header_name.findall(text):
+        if mod:
+            module = mod
+        name = target or (f"{module}.{cls}" if module and cls else None)
+        if name is not None:
+            record((None, name), qualname_overrides.get((None, name)))
+
+
+def _record_xrefs(_app: Sphinx, doctree: nodes.document) -> None:
+    """Record lookups for references, in case they get resolved using overrides.
+
+    This happens in ``missing-reference``, after the environment has been pickled,
+    so lookups made there wouldn’t be saved.
+    To keep the environment small, only Python references to overridden names
+    or to other names in the same namespaces are recorded.
+    References to other names are only updated after adding overrides for them
+    when their documents are read again (e.g. with ``sphinx-build -E``).
+    """
+    from sphinx.addnodes import pending_xref
+
+    from . import qualname_overrides
+
+    for node in doctree.findall(pending_xref):
+        if node.get("refdomain") != "py":
+            continue
+        key = (f"py:{node.get('reftype')}", target := node["reftarget"])
+        result = qualname_overrides.get(key)
+        if result is not None or target.rpartition(".")[0] in _namespaces:
+            record(key, result)
+
+
+@contextmanager
+def collect() -> Iterator[dict[_Lookup, None]]:
+    """Collect the lookups made in this context (including nested contexts).
+
+    Results computed using overrides can be cached with the collected lookups,
+    which are passed to :func:`replay` when reusing them, so usage is still recorded.
+    """
+    lookups: dict[_Lookup, None] = {}
+    _collecting.append(lookups)
+    try:
+        yield lookups
+    finally:
+        _collecting.pop()
+        if _collecting:
+            _collecting[-1].update(lookups)
+
+
+def track(key: _Key, site: str) -> None:
+    """Add a lookup to the innermost :func:`collect` context."""
+    if _collecting:
+        _collecting[-1][key, site] = None
+
+
+def replay(lookups: Iterable[_Lookup]) -> None:
+    """Repeat lookups collected by :func:`collect`."""
+    from ._override_stats import get_override
+
+    for key, site in lookups:
+        get_override(key, site)
+
+
+def _checksum(result: tuple[str | None, str] | None) -> int:
+    return zlib.crc32(repr(result).encode())
+
+
+def _fingerprint() -> str:
+    from . import qualname_overrides
+
+    items = sorted(qualname_overrides.items(), key=repr)
+    return hashlib.blake2b(repr(items).encode(), digest_size=16).hexdigest()
+
+
+def _init_usage(app: Sphinx) -> None:
+    from . import qualname_overrides
+
+    global _env  # noqa: PLW0603
+    _env = app.env
+    _namespaces.clear()
+    _namespaces.update(
+        name[:i]
+        for _, name in qualname_overrides
+        for i, c in enumerate(name)
+        if c == "."
+    )
+    if not hasattr(app.env, "scanpydoc_override_usage"):
+        app.env.scanpydoc_override_usage = {}  # type: ignore[attr-defined]
+
+
+def _get_outdated(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    added: set[str],
+    changed: set[str],
+    _removed: set[str],
+) -> list[str]:
+    from . import qualname_overrides
+
+    fingerprint = _fingerprint()
+    old = getattr(env, "scanpydoc_overrides_fingerprint", fingerprint)
+    env.scanpydoc_overrides_fingerprint = fingerprint  # type: ignore[attr-defined]
+    if old == fingerprint:
+        return []
+    usage: dict[str, _Usage] = env.scanpydoc_override_usage  # type: ignore[attr-defined]
+    rereading = added | changed
+    outdated = [
+        docname
+        for docname, doc_usage in usage.items()
+        if docname in env.all_docs
+        and docname not in rereading
+        and any(
+            _checksum(qualname_overrides.get(key)) != checksum
+            for key, checksum in doc_usage.items()
+        )
+    ]
+    logger.info(
+        "qualname_overrides changed, %d documents use changed overrides", len(outdated)
+    )
+    return outdated
+
+
+def _purge_usage(_app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+    env.scanpydoc_override_usage.pop(docname, None)  # type: ignore[attr-defined]
+
+
+def _merge_usage(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    docnames: Iterable[str],
+    other: BuildEnvironment,
+) -> None:
+    ours: dict[str, _Usage] = env.scanpydoc_override_usage  # type: ignore[attr-defined]
+    theirs: dict[str, _Usage] = other.scanpydoc_override_usage  # type: ignore[attr-defined]
+    ours.update((d, theirs[d]) for d in docnames if d in theirs)
+
+
+def setup(app: Sphinx) -> None:
+    # after overrides were finalized by `validate_overrides`
+    app.connect("builder-inited", _init_usage, priority=900)
+    app.connect("env-get-outdated", _get_outdated)
+    app.connect("doctree-read", _record_xrefs)
+    app.connect("env-purge-doc", _purge_usage)
+    app.connect("env-merge-info", _merge_usage)
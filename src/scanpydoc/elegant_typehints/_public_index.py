@@ -0,0 +1,93 @@
+"""Derive ``qualname_overrides`` from packages’ public API."""
+
+from __future__ import annotations
+
+import json
+from types import ModuleType, FunctionType
+from typing import TYPE_CHECKING, TypeAliasType
+from importlib import import_module
+from collections import deque
+from importlib.metadata import PackageNotFoundError, version, packages_distributions
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from collections.abc import Iterable
+
+
+def load_index(package: str, cache_dir: Path | None = None) -> dict[str, str]:
+    """Load a package’s index from ``cache_dir``, or build and cache it.
+
+    The cache is keyed by the package’s version.
+    If the version can’t be determined, the index is always rebuilt.
+    """
+    path = (
+        None
+        if cache_dir is None or (v := _package_version(package)) is None
+        else cache_dir / f"scanpydoc-public-api-{package}-{v}.json"
+    )
+    if path is not None and path.is_file():
+        index: dict[str, str] = json.loads(path.read_text())
+        return index
+    index = build_index(package)
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(index, indent=0, sort_keys=True))
+    return index
+
+
+def build_index(package: str) -> dict[str, str]:
+    """Map private paths of a package’s public objects to their public paths.
+
+    Walks the package’s public namespace breadth-first,
+    so the shortest public path wins.
+    """
+    index: dict[str, str] = {}
+    root = import_module(package)
+    seen = {root.__name__}
+    queue = deque([root])
+    while queue:
+        mod = queue.popleft()
+        for name in _public_names(mod):
+            try:
+                obj = getattr(mod, name)
+            except AttributeError:  # pragma: no cover
+                continue  # broken `__all__`
+            if isinstance(obj, ModuleType):
+                if _in_package(obj.__name__, package) and obj.__name__ not in seen:
+                    seen.add(obj.__name__)
+                    queue.append(obj)
+                continue
+            if not isinstance(obj, type | FunctionType | TypeAliasType):
+                continue
+            modname = obj.__module__
+            if modname is None or not _in_package(modname, package):
+                continue  # re-exported from another package
+            qualname = getattr(obj, "__qualname__", obj.__name__)
+            private, public = f"{modname}.{qualname}", f"{mod.__name__}.{name}"
+            if private != public:
+                index.setdefault(private, public)
+    return index
+
+
+def _public_names(mod: ModuleType) -> Iterable[str]:
+    if (all_ := getattr(mod, "__all__", None)) is not None:
+        return all_  # type: ignore[no-any-return]
+    return [name for name in vars(mod) if not name.startswith("_")]
+
+
+def _in_package(modname: str, package: str) -> bool:
+    return modname == package or modname.startswith(f"{package}.")
+
+
+def _package_version(package: str) -> str | None:
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        pass
+    for dist in packages_distributions().get(package, []):
+        try:
+            return version(dist)
+        except PackageNotFoundError:  # pragma: no cover
+            continue
+    return None
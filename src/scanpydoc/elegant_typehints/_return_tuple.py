@@ -1,28 +1,41 @@
 from __future__ import annotations
 
 import re
+import sys
+import hashlib
 import inspect
 from types import UnionType
 from typing import TYPE_CHECKING, Union, get_args, get_origin, get_type_hints
 from typing import Tuple as t_Tuple  # noqa: UP035
 from logging import getLogger
+from pathlib import Path
 
-from sphinx.ext.napoleon import NumpyDocstring  # type: ignore[attr-defined]
-from sphinx_autodoc_typehints import format_annotation
+from ._override_usage import replay
+from ._annotation_cache import tracking
 
 
 if TYPE_CHECKING:
     from typing import Any
-    from collections.abc import Sequence
+    from collections.abc import Iterable, Iterator, Sequence
 
+    from sphinx.config import Config
     from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
     from sphinx.ext.autodoc import Options
+    from sphinx.ext.napoleon import NumpyDocstring  # type: ignore[attr-defined]
+
+    from ._override_usage import _Lookup
+
+    type _Entry = tuple[list[str] | None, list[_Lookup]]
+    """Processed docstring (:data:`None` if unchanged) and override lookups made."""
+    type _ModuleCache = tuple[str, dict[str, _Entry]]
+    """Source fingerprint of a module and processed docstrings by docstring key."""
 
 
 UNION_TYPES = {Union, UnionType}
 
 
-__all__ = ["_parse_returns_section", "process_docstring", "setup"]
+__all__ = ["_parse_returns_section", "iter_typed_returns", "process_docstring", "setup"]
 
 logger = getLogger(__name__)
 re_ret = re.compile("^:returns?: ")
@@ -61,52 +74,209 @@ def process_docstring(  # noqa: PLR0913
     if what in ("class", "exception"):
         obj = obj.__init__
     obj = inspect.unwrap(obj)
+
+    entries = _get_cache_entries(app.env, obj)
+    if entries is None or (key := _docstring_key(obj, lines)) is None:
+        _add_return_types(app, obj, lines)
+        return
+    if key in entries:
+        cached, lookups = entries[key]
+        replay(lookups)  # so usage is recorded for the current document
+        if cached is not None:
+            lines[:] = cached
+        return
+    with tracking() as tracked:
+        changed = _add_return_types(app, obj, lines)
+    if tracked.cacheable:  # e.g. collapsed annotations need to be registered again
+        entries[key] = (lines.copy() if changed else None), list(tracked.lookups)
+
+
+def _get_type_hints(obj: Any) -> dict[str, Any]:  # noqa: ANN401
     try:
-        hints = get_type_hints(obj)
+        return get_type_hints(obj)
+    except NameError:
+        # maybe a name only imported `if TYPE_CHECKING:`
+        from ._type_checking import placeholders_for
+
+        if not (localns := placeholders_for(obj)):
+            raise
+        return get_type_hints(obj, localns=localns)
+
+
+def _add_return_types(app: Sphinx, obj: Any, lines: list[str]) -> bool:  # noqa: ANN401
+    try:
+        hints = _get_type_hints(obj)
     except (AttributeError, NameError, TypeError):  # pragma: no cover
         # Introspecting a slot wrapper can raise TypeError
-        return
+        return False
     ret_types = get_tuple_annot(hints.get("return"))
     if ret_types is None:
-        return
+        return False
+
+    changed = False
+    for l, line in enumerate(iter_typed_returns(lines, ret_types, app.config)):
+        if line is not lines[l]:  # only write back changed lines
+            lines[l] = line
+            changed = True
+    return changed
 
-    idxs_ret_names = _get_idxs_ret_names(lines)
-    if len(idxs_ret_names) == len(ret_types):
-        for l, rt in zip(idxs_ret_names, ret_types, strict=False):
-            typ = format_annotation(rt, app.config)
-            if (line := lines[l]).lstrip() in {":returns: :", ":return: :", ":"}:
-                transformed = f"{line[:-1]}{typ}"
-            else:
-                transformed = f"{line} : {typ}"
-            lines[l : l + 1] = [transformed]
-
-
-def _get_idxs_ret_names(lines: Sequence[str]) -> list[int]:
-    # Get return section
-    i_prefix = None
-    l_start = 0
-    for l, line in enumerate(lines):
+
+def iter_typed_returns(
+    lines: Iterable[str], ret_types: Sequence[Any], config: Config
+) -> Iterator[str]:
+    """Add types to the names in a docstring’s returns section.
+
+    Only happens if there are as many names as ``ret_types``.
+    Only the returns section is buffered, so ``lines`` can be a generator,
+    e.g. the output of another docstring processor.
+    Unchanged lines are yielded as-is.
+    """
+    section: list[tuple[str, bool]] = []
+    for line, is_name in _scan_returns(lines):
+        if is_name is not None:
+            section.append((line, is_name))
+            continue
+        if section:
+            yield from _type_section(section, ret_types, config)
+            section.clear()
+        yield line
+    yield from _type_section(section, ret_types, config)
+
+
+def _scan_returns(lines: Iterable[str]) -> Iterator[tuple[str, bool | None]]:
+    """Classify lines in one forward pass.
+
+    Yields each line with ``None`` if it’s outside of the returns section,
+    and otherwise a bool indicating if it contains a return value name.
+    Since a name is only recognized if the next line is indented,
+    lines in the returns section are yielded with a delay of one line.
+    """
+    i_prefix: int | None = None
+    prev: tuple[str, bool] | None = None
+    lines = iter(lines)
+    for line in lines:
         if i_prefix is None:
-            m = re_ret.match(line)
-            if m:
-                i_prefix = m.span()[1]
-                l_start = l
-        elif len(line[:i_prefix].strip()) > 0:
-            l_end = l - 1
-            break
+            if (m := re_ret.match(line)) is None:
+                yield line, None
+                continue
+            i_prefix = m.end()
+        elif prev is not None:
+            prev_line, prev_is_name = prev
+            yield prev_line, prev_is_name and line.startswith("    ")
+            if line[:i_prefix].strip():  # end of returns section
+                yield line, None
+                break
+        rest = line[i_prefix:]
+        prev = line, rest == ":" or rest.isidentifier()
     else:
-        l_end = len(lines) - 1
-    if i_prefix is None:
-        return []
+        if prev is not None:
+            yield prev[0], False
+        return
+    for line in lines:
+        yield line, None
 
-    # Meat
-    idxs_ret_names = []
-    for l, line in enumerate([l[i_prefix:] for l in lines[l_start : l_end + 1]]):
-        if (line == ":" or line.isidentifier()) and (
-            lines[l + l_start + 1].startswith("    ")
-        ):
-            idxs_ret_names.append(l + l_start)
-    return idxs_ret_names
+
+def _type_section(
+    section: Sequence[tuple[str, bool]], ret_types: Sequence[Any], config: Config
+) -> Iterator[str]:
+    if sum(is_name for _, is_name in section) != len(ret_types):
+        yield from (line for line, _ in section)
+        return
+    from sphinx_autodoc_typehints import format_annotation
+
+    types = iter(ret_types)
+    for line, is_name in section:
+        if not is_name:
+            yield line
+            continue
+        typ = format_annotation(next(types), config)
+        if line.lstrip() in {":returns: :", ":return: :", ":"}:
+            yield f"{line[:-1]}{typ}"
+        else:
+            yield f"{line} : {typ}"
+
+
+def _get_cache_entries(
+    env: BuildEnvironment,
+    obj: Any,  # noqa: ANN401
+) -> dict[str, _Entry] | None:
+    """Get cached docstrings for ``obj``’s module, evicting them if it changed."""
+    cache: dict[str, _ModuleCache] | None = getattr(
+        env, "scanpydoc_docstring_cache", None
+    )
+    modname = getattr(obj, "__module__", None)
+    if cache is None or modname is None:
+        return None
+    if (fingerprint := _module_fingerprint(modname)) is None:
+        return None
+    cached_fingerprint, entries = cache.get(modname, (None, {}))
+    if cached_fingerprint != fingerprint:
+        cache[modname] = fingerprint, (entries := {})
+    return entries
+
+
+def _module_fingerprint(modname: str) -> str | None:
+    file = getattr(sys.modules.get(modname), "__file__", None)
+    if file is None:
+        return None
+    try:
+        stat = Path(file).stat()
+    except OSError:  # pragma: no cover
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _docstring_key(obj: Any, lines: Sequence[str]) -> str | None:  # noqa: ANN401
+    try:
+        ret_annotation = inspect.get_annotations(obj).get("return")
+    except (NameError, TypeError):  # pragma: no cover
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    for part in (*lines, repr(ret_annotation)):
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _config_key(app: Sphinx) -> str:
+    """Fingerprint the config that influences how return types are rendered."""
+    from . import qualname_overrides
+
+    relevant = {
+        name: app.config[name]
+        for name in (
+            "typehints_fully_qualified",
+            "always_use_bars_union",
+            "simplify_optional_unions",
+        )
+        if name in app.config
+    }
+    overrides = sorted(qualname_overrides.items(), key=repr)
+    return hashlib.blake2b(
+        repr((relevant, overrides)).encode(), digest_size=16
+    ).hexdigest()
+
+
+def _init_cache(app: Sphinx) -> None:
+    """Create the docstring cache, or clear it if the relevant config changed."""
+    key = _config_key(app)
+    if getattr(app.env, "scanpydoc_docstring_cache_key", None) != key:
+        app.env.scanpydoc_docstring_cache_key = key  # type: ignore[attr-defined]
+        app.env.scanpydoc_docstring_cache = {}  # type: ignore[attr-defined]
+
+
+def _merge_cache(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    _docnames: Iterable[str],
+    other: BuildEnvironment,
+) -> None:
+    cache: dict[str, _ModuleCache] = env.scanpydoc_docstring_cache  # type: ignore[attr-defined]
+    for modname, (fingerprint, entries) in other.scanpydoc_docstring_cache.items():  # type: ignore[attr-defined]
+        if (own := cache.get(modname)) is not None and own[0] == fingerprint:
+            own[1].update(entries)
+        else:
+            cache[modname] = fingerprint, entries
 
 
 def _parse_returns_section(self: NumpyDocstring, section: str) -> list[str]:  # noqa: ARG001
@@ -126,16 +296,29 @@ def _delete_sphinx_autodoc_typehints_docstring_processor(app: Sphinx) -> None:
             app.disconnect(listener.id)
 
 
+def _patch_napoleon(app: Sphinx, _config: Config) -> None:
+    if "sphinx.ext.napoleon" not in app.extensions:
+        return  # don’t import napoleon if it isn’t used
+    from sphinx.ext.napoleon import NumpyDocstring  # type: ignore[attr-defined]
+
+    NumpyDocstring._parse_returns_section = _parse_returns_section  # type: ignore[method-assign,assignment]  # noqa: SLF001
+
+
 def setup(app: Sphinx) -> None:
     """Patches the Sphinx app and :mod:`sphinx.ext.napoleon` in some ways.
 
     1. Replaces the return section parser of napoleon’s NumpyDocstring
-       with one that just adds a prose section.
+       with one that just adds a prose section (if napoleon is loaded).
     2. Removes sphinx-autodoc-typehints’s docstring processor that expects
        NumpyDocstring’s old behavior.
-    2. Adds our own docstring processor that adds tuple return types
+    3. Adds our own docstring processor that adds tuple return types
        If the docstring contains a definition list of appropriate length.
+       Its results are cached in the build environment,
+       so unchanged docstrings don’t need to be processed again on rebuilds.
     """
-    NumpyDocstring._parse_returns_section = _parse_returns_section  # type: ignore[method-assign,assignment]  # noqa: SLF001
+    app.connect("config-inited", _patch_napoleon)
     _delete_sphinx_autodoc_typehints_docstring_processor(app)
     app.connect("autodoc-process-docstring", process_docstring, 1000)
+    # run after qualname_overrides are finalized
+    app.connect("builder-inited", _init_cache, priority=900)
+    app.connect("env-merge-info", _merge_cache)
@@ -12,6 +12,8 @@ if TYPE_CHECKING:
 
 class RoleMapping(MutableMapping[tuple[str | None, str], tuple[str | None, str]]):
     data: dict[tuple[str | None, str], tuple[str | None, str]]
+    _key_roles: set[str | None] | None
+    """Roles used in keys, computed lazily."""
 
     def __init__(
         self,
@@ -19,6 +21,7 @@ class RoleMapping(MutableMapping[tuple[str | None, str], tuple[str | None, str]]
         /,
     ) -> None:
         self.data = dict(mapping)  # type: ignore[arg-type]
+        self._key_roles = None
 
     @classmethod
     def from_user(
@@ -40,6 +43,8 @@ class RoleMapping(MutableMapping[tuple[str | None, str], tuple[str | None, str]]
         self, key: tuple[str | None, str], value: tuple[str | None, str]
     ) -> None:
         self.data[key] = value
+        if self._key_roles is not None:
+            self._key_roles.add(key[0])
 
     def __getitem__(self, key: tuple[str | None, str]) -> tuple[str | None, str]:
         if key[0] is not None:
@@ -47,7 +52,9 @@ class RoleMapping(MutableMapping[tuple[str | None, str], tuple[str | None, str]]
                 return self.data[key]
             except KeyError:
                 return self.data[None, key[1]]
-        for known_role in chain([None], {r for r, _ in self}):
+        if self._key_roles is None:
+            self._key_roles = {r for r, _ in self}
+        for known_role in chain([None], self._key_roles - {None}):
             try:
                 return self.data[known_role, key[1]]
             except KeyError:
@@ -65,6 +72,7 @@ class RoleMapping(MutableMapping[tuple[str | None, str], tuple[str | None, str]]
 
     def __delitem__(self, key: tuple[str | None, str]) -> None:
         del self.data[key]
+        self._key_roles = None
 
     def __iter__(self) -> Iterator[tuple[str | None, str]]:
         return self.data.__iter__()
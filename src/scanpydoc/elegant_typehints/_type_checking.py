@@ -0,0 +1,109 @@
+"""Stand-ins for names that are only imported ``if TYPE_CHECKING:``.
+
+Modules often import types for annotations only while type checking,
+so evaluating their annotations fails with a :exc:`NameError`.
+Instead of executing those imports, we read them from the module’s AST
+and provide placeholder classes that format like the real ones.
+"""
+
+from __future__ import annotations
+
+import ast
+import sys
+from types import GenericAlias
+from typing import TYPE_CHECKING
+from pathlib import Path
+
+
+if TYPE_CHECKING:
+    from types import ModuleType
+    from collections.abc import Iterator
+
+
+_cache: dict[str, dict[str, type]] = {}
+"""Placeholders by name, by module name."""
+
+
+class Placeholder(type):
+    """Metaclass for classes standing in for a not imported object."""
+
+    _is_module: bool
+
+    def __getattr__(cls, name: str) -> type:
+        if name.startswith("_"):  # e.g. probed by `typing`
+            raise AttributeError(name)
+        if cls._is_module:
+            return _make(f"{cls.__module__}.{cls.__qualname__}".lstrip("."), name)
+        return _make(cls.__module__, f"{cls.__qualname__}.{name}")
+
+    def __getitem__(cls, args: object) -> GenericAlias:
+        return GenericAlias(cls, args)
+
+    def __repr__(cls) -> str:
+        return f"{cls.__module__}.{cls.__qualname__}".lstrip(".")
+
+
+def _make(module: str, qualname: str, *, is_module: bool = False) -> type:
+    name = qualname.rsplit(".", 1)[-1]
+    ns = dict(__module__=module, __qualname__=qualname, _is_module=is_module)
+    return Placeholder(name, (), ns)
+
+
+def placeholders(mod: ModuleType) -> dict[str, type]:
+    """Get placeholders for names imported by ``mod`` only when type checking.
+
+    Names that are also available at runtime are skipped.
+    """
+    if (cached := _cache.get(mod.__name__)) is None:
+        cached = _cache[mod.__name__] = dict(_parse(mod))
+    return {name: p for name, p in cached.items() if name not in vars(mod)}
+
+
+def placeholders_for(obj: object) -> dict[str, type]:
+    """Get :func:`placeholders` for the module ``obj`` is defined in."""
+    mod = sys.modules.get(getattr(obj, "__module__", None) or "")
+    return {} if mod is None else placeholders(mod)
+
+
+def _parse(mod: ModuleType) -> Iterator[tuple[str, type]]:
+    try:
+        source = Path(mod.__file__ or "").read_text()
+        tree = ast.parse(source)
+    except (OSError, SyntaxError, ValueError):
+        return
+    for stmt in tree.body:
+        if isinstance(stmt, ast.If) and _is_type_checking(stmt.test):
+            yield from _imports(stmt.body, mod)
+
+
+def _is_type_checking(test: ast.expr) -> bool:
+    match test:
+        case ast.Name(id="TYPE_CHECKING") | ast.Attribute(attr="TYPE_CHECKING"):
+            return True
+    return False
+
+
+def _imports(body: list[ast.stmt], mod: ModuleType) -> Iterator[tuple[str, type]]:
+    for stmt in body:
+        if isinstance(stmt, ast.Import):
+            for alias in stmt.names:
+                if alias.asname is None:  # `import a.b` binds `a`
+                    name = alias.name.split(".", 1)[0]
+                    yield name, _make("", name, is_module=True)
+                else:
+                    yield alias.asname, _make("", alias.name, is_module=True)
+        elif isinstance(stmt, ast.ImportFrom):
+            module = _absolute(stmt.module, stmt.level, mod)
+            for alias in stmt.names:
+                if alias.name != "*":
+                    yield alias.asname or alias.name, _make(module, alias.name)
+        elif isinstance(stmt, ast.If | ast.Try):
+            yield from _imports(stmt.body, mod)
+
+
+def _absolute(module: str | None, level: int, mod: ModuleType) -> str:
+    if level == 0:
+        return module or ""
+    package = mod.__package__ or mod.__name__.rpartition(".")[0]
+    base = package.rsplit(".", level - 1)[0] if level > 1 else package
+    return f"{base}.{module}" if module else base
@@ -27,16 +27,23 @@ this will render like the following:
 
    .. include:: 1.2.1.md
    .. include:: 1.2.0.md
+
+The version files are dependencies of the document containing the directive,
+so it is re-read when one of them is added, removed, or changed.
+Files in reStructuredText that didn’t change are not parsed again,
+their cached doctrees are reused instead.
 """
 
 from __future__ import annotations
 
 import re
+import hashlib
 import itertools
 from typing import TYPE_CHECKING
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import field, dataclass
 
+from sphinx import addnodes
 from docutils import nodes
 from packaging.version import Version
 from sphinx.util.parsing import nested_parse_to_nodes
@@ -50,12 +57,136 @@ if TYPE_CHECKING:
     from collections.abc import Iterable, Sequence
 
     from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
     from myst_parser.mdit_to_docutils.base import DocutilsRenderer
 
 
 FULL_VERSION_RE = re.compile(r"^(\d+)\.(\d+)\.(\d+)(?:.*)?$")
 """Regex matching a full version number including patch part, maybe with more after."""
 
+UNSAFE_NODES = (
+    nodes.system_message,
+    nodes.problematic,
+    nodes.pending,
+    nodes.footnote,
+    nodes.footnote_reference,
+    nodes.citation,
+    nodes.citation_reference,
+    nodes.substitution_definition,
+    nodes.substitution_reference,
+)
+"""Docutils nodes that are registered with the document in ways we can’t replay."""
+SAFE_SPHINX_NODES = (
+    addnodes.pending_xref,
+    addnodes.literal_emphasis,
+    addnodes.literal_strong,
+)
+"""Sphinx nodes whose directives and roles don’t modify the environment."""
+
+
+def _version_files(dir_: Path) -> list[Path]:
+    return [f for f in dir_.iterdir() if FULL_VERSION_RE.match(f.stem)]
+
+
+@dataclass
+class _Parsed:
+    """Nodes parsed from a version file, detached from their document."""
+
+    key: str
+    """Hash of the file’s content and where it was parsed."""
+    tree: list[nodes.Node]
+    explicit: list[bool]
+    """For each named node (in document order), if it is an explicit target."""
+
+    @classmethod
+    def capture(
+        cls, key: str, parsed: Sequence[nodes.Node], document: nodes.document
+    ) -> _Parsed | None:
+        """Copy ``parsed`` if it can be restored like it was parsed."""
+        if not all(_is_safe(node) for top in parsed for node in top.findall()):
+            return None
+        copies = [top.deepcopy() for top in parsed]
+        for top in copies:  # don’t pickle the document with the env
+            for node in top.findall():
+                node.document = None  # type: ignore[assignment]
+        explicit = [document.nametypes[node["names"][0]] for node in _named(copies)]
+        return cls(key, copies, explicit)
+
+    def restore(self, document: nodes.document) -> list[nodes.Node] | None:
+        """Copy the nodes and register them with ``document`` as parsing would.
+
+        Returns :data:`None` if names conflict, so messages would be generated.
+        """
+        copies = [top.deepcopy() for top in self.tree]
+        named = list(_named(copies))
+        if any(name in document.nameids for node in named for name in node["names"]):
+            return None
+        explicit = iter(self.explicit)
+        for node in (node for top in copies for node in top.findall(nodes.Element)):
+            if node["names"]:
+                node["ids"] = []  # auto-generated IDs depend on the document
+                if next(explicit):
+                    document.note_explicit_target(node, node)
+                else:
+                    document.note_implicit_target(node, node)
+            if "refname" not in node:
+                continue
+            if isinstance(node, nodes.target):
+                document.note_indirect_target(node)
+            else:
+                document.note_refname(node)
+        return copies
+
+
+def _is_safe(node: nodes.Node) -> bool:
+    if isinstance(node, nodes.Text):
+        return True
+    if isinstance(node, UNSAFE_NODES) or not (
+        type(node).__module__ == nodes.__name__ or isinstance(node, SAFE_SPHINX_NODES)
+    ):
+        return False
+    assert isinstance(node, nodes.Element)  # noqa: S101
+    ids, names = node["ids"], node["names"]
+    return not (
+        node.get("refid")
+        or node.get("anonymous")
+        or node["dupnames"]
+        or len(ids) > (1 if names else 0)
+    )
+
+
+def _named(tops: Iterable[nodes.Node]) -> Iterable[nodes.Element]:
+    return (
+        node for top in tops for node in top.findall(nodes.Element) if node["names"]
+    )
+
+
+@dataclass
+class _DocCache:
+    """Version files included by a document, and what they were parsed to."""
+
+    listings: dict[str, list[str]] = field(default_factory=dict)
+    """Names of the version files in each directory."""
+    parsed: dict[str, _Parsed] = field(default_factory=dict)
+    previous: dict[str, _Parsed] = field(default_factory=dict)
+    """Files parsed in the previous read of the document, reused if unchanged."""
+
+
+def _get_cache(env: BuildEnvironment) -> dict[str, _DocCache]:
+    if not hasattr(env, "scanpydoc_release_notes"):
+        env.scanpydoc_release_notes = {}  # type: ignore[attr-defined]
+    return env.scanpydoc_release_notes  # type: ignore[attr-defined,no-any-return]
+
+
+def _get_doc_cache(env: BuildEnvironment) -> _DocCache:
+    return _get_cache(env).setdefault(env.docname, _DocCache())
+
+
+def _n_dependencies(env: BuildEnvironment, document: nodes.document) -> int:
+    recorded = document.settings.record_dependencies
+    n_env = len(env.dependencies.get(env.docname, ()))
+    return n_env + len(getattr(recorded, "list", ()))
+
 
 @dataclass
 class _Backend:
@@ -64,13 +195,15 @@ class _Backend:
 
     def run(self) -> Sequence[nodes.Node]:
         versions = sorted(
-            (
-                (Version(f.stem), f)
-                for f in self.dir.iterdir()
-                if FULL_VERSION_RE.match(f.stem)
-            ),
+            ((Version(f.stem), f) for f in _version_files(self.dir)),
             reverse=True,  # descending
         )
+        env = self.instance.env
+        _get_doc_cache(env).listings[str(self.dir)] = sorted(
+            f.name for _, f in versions
+        )
+        for _, f in versions:
+            env.note_dependency(f)
         version_groups = itertools.groupby(
             versions, key=lambda vf: (vf[0].major, vf[0].minor)
         )
@@ -105,12 +238,29 @@ class _Backend:
         return target, section
 
     def render_include(self, path: Path) -> Sequence[nodes.Node]:
-        return nested_parse_to_nodes(
-            self.instance.state,
-            path.read_text(),
-            source=str(path),
-            offset=self.instance.content_offset,
+        env, document = self.instance.env, self.instance.state.document
+        text, offset = path.read_text(), self.instance.content_offset
+        key = hashlib.blake2b(f"{offset}\n{text}".encode(), digest_size=16).hexdigest()
+        cache = _get_doc_cache(env)
+        cached = cache.previous.get(str(path)) or cache.parsed.get(str(path))
+        if (
+            cached is not None
+            and cached.key == key
+            and (rv := cached.restore(document)) is not None
+        ):
+            cache.parsed[str(path)] = cached
+            return rv
+
+        n_deps = _n_dependencies(env, document)
+        rv = nested_parse_to_nodes(
+            self.instance.state, text, source=str(path), offset=offset
         )
+        # included files would need to be part of the key
+        if _n_dependencies(env, document) == n_deps and (
+            parsed := _Parsed.capture(key, rv, document)
+        ):
+            cache.parsed[str(path)] = parsed
+        return rv
 
 
 # TODO(flying-sheep): Remove once MyST-Parser bug is fixed
@@ -183,8 +333,70 @@ class ReleaseNotes(SphinxDirective):
         return cls(dir_, self).run()
 
 
+def _init_cache(app: Sphinx) -> None:
+    from sphinx.environment import CONFIG_OK
+
+    if app.env.config_status != CONFIG_OK:  # parsing might have changed
+        app.env.scanpydoc_release_notes = {}  # type: ignore[attr-defined]
+
+
+def _get_outdated(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    added: set[str],
+    changed: set[str],
+    _removed: set[str],
+) -> list[str]:
+    """Find documents with release notes in directories with added or removed files."""
+    rereading = added | changed
+    return [
+        docname
+        for docname, cache in _get_cache(env).items()
+        if docname in env.all_docs
+        and docname not in rereading
+        and any(
+            not Path(dir_).is_dir()
+            or sorted(f.name for f in _version_files(Path(dir_))) != names
+            for dir_, names in cache.listings.items()
+        )
+    ]
+
+
+def _purge_cache(_app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+    if (cache := _get_cache(env).get(docname)) is None:
+        return
+    # keep parsed files around until the document has been read again
+    cache.previous.update(cache.parsed)
+    cache.parsed, cache.listings = {}, {}
+
+
+def _merge_cache(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    docnames: Iterable[str],
+    other: BuildEnvironment,
+) -> None:
+    ours, theirs = _get_cache(env), _get_cache(other)
+    ours.update((d, theirs[d]) for d in docnames if d in theirs)
+
+
+def _prune_cache(_app: Sphinx, env: BuildEnvironment) -> None:
+    """Drop files that weren’t used when reading documents again."""
+    caches = _get_cache(env)
+    for docname, cache in list(caches.items()):
+        if cache.listings:
+            cache.previous = {}
+        else:  # removed, or doesn’t contain release notes anymore
+            del caches[docname]
+
+
 @_setup_sig
 def setup(app: Sphinx) -> dict[str, Any]:
     """Add the ``release-notes`` directive."""
     app.add_directive("release-notes", ReleaseNotes)
+    app.connect("builder-inited", _init_cache)
+    app.connect("env-get-outdated", _get_outdated)
+    app.connect("env-purge-doc", _purge_cache)
+    app.connect("env-merge-info", _merge_cache)
+    app.connect("env-updated", _prune_cache)
     return metadata
@@ -90,5 +90,7 @@ def setup(app: Sphinx) -> dict[str, bool]:  # pragma: no cover
 
     # if we’re on ReadTheDocs, hide the pydata-sphinx-theme search popup
     app.add_js_file("scripts/rtd-sphinx-search.js", loading_method="defer")
+    # expand collapsed field lists (see `scanpydoc.definition_list_typed_field`)
+    app.add_js_file("scripts/field-items.js", loading_method="defer")
 
     return dict(parallel_read_safe=True, parallel_write_safe=True)
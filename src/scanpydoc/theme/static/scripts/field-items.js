@@ -0,0 +1,27 @@
+/**
+ * Expand field lists collapsed by `field_items_collapse_threshold`
+ * when navigating to an anchor inside them,
+ * for browsers that don’t do that by themselves.
+ */
+
+function expandTarget() {
+    const id = decodeURIComponent(location.hash.slice(1))
+    const target = id && document.getElementById(id)
+    if (!target) {
+        return
+    }
+    let expanded = false
+    let details = target.closest("details")
+    while (details) {
+        expanded ||= !details.open
+        details.open = true
+        details = details.parentElement?.closest("details")
+    }
+    // the browser couldn’t scroll to the target while it was hidden
+    if (expanded) {
+        target.scrollIntoView()
+    }
+}
+
+addEventListener("hashchange", expandTarget)
+expandTarget()
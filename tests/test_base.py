@@ -44,3 +44,19 @@ def test_all_get_installed(
     assert set(setups_called) == setups_seen
     for app2 in setups_called.values():
         assert app is app2
+
+
+def test_pickle_sizes(make_app_setup: MakeApp) -> None:
+    from scanpydoc._pickle_size import pickle_sizes, report_pickle_sizes
+
+    app = make_app_setup(
+        extensions=[
+            "scanpydoc.definition_list_typed_field",
+            "scanpydoc.release_notes",
+        ]
+    )
+    handlers = [listener.handler for listener in app.events.listeners["build-finished"]]
+    assert handlers.count(report_pickle_sizes) == 1
+    sizes = pickle_sizes(app)
+    assert {"config.compact_field_items", "config.field_items_index"} <= set(sizes)
+    assert "config.qualname_overrides" not in sizes
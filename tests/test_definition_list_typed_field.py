@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import re
+import json
 from typing import TYPE_CHECKING
 
 import pytest
@@ -9,8 +11,16 @@ from sphinx import addnodes
 from docutils import nodes
 from sphinx.testing.restructuredtext import parse
 
+from scanpydoc.definition_list_typed_field import (
+    FieldItemsDetails,
+    _tokenize_type_spec,
+)
+
 
 if TYPE_CHECKING:
+    from typing import Any
+    from pathlib import Path
+
     from sphinx.application import Sphinx
 
     from scanpydoc.testing import MakeApp
@@ -102,8 +112,218 @@ def test_convert_params(
     )
 
 
+def test_type_specs(app: Sphinx) -> None:
+    code = """\
+.. py:function:: f(a, b, c)
+
+   :param a: A
+   :type a: {'x', 'y'} or Mapping[str, int], default 'x'
+   :param b: B
+   :type b: ``int`` or None, optional
+   :param c: C
+   :type c: {'x', 'y'} or Mapping[str, int], default 'x'
+"""
+    _tokenize_type_spec.cache_clear()
+    doc = parse(app, code)
+    [cyr_a, cyr_b, cyr_c] = doc.findall(nodes.classifier)
+    assert (
+        cyr_a.astext()
+        == cyr_c.astext()
+        == "{'x', 'y'} or Mapping[str, int], default 'x'"
+    )
+    assert [x["reftarget"] for x in cyr_a.findall(addnodes.pending_xref)] == [
+        "Mapping",
+        "str",
+        "int",
+    ]
+    assert [n.astext() for n in cyr_a.findall(nodes.literal)] == ["'x'", "'y'", "'x'"]
+    # literals and keywords don’t become references, text around markup is parsed
+    assert [type(n) for n in cyr_b] == [
+        nodes.literal,
+        nodes.Text,
+        addnodes.pending_xref,
+        nodes.Text,
+    ]
+    assert isinstance(xref := cyr_b[2], addnodes.pending_xref)
+    assert xref["reftarget"] == "None"
+    # identical type specifications are only parsed once
+    assert _tokenize_type_spec.cache_info().hits >= 1
+
+
+def test_compact(make_app_setup: MakeApp) -> None:
+    app = make_app_setup(compact_field_items=True)
+    app.setup_extension("scanpydoc.definition_list_typed_field")
+    doc = parse(app, params_code)
+    [dl] = doc.findall(nodes.definition_list)
+    assert "field-items-compact" in dl["classes"]
+    assert isinstance(dli := dl[0], nodes.definition_list_item)
+    # the classifier is a sibling of the term, which only contains the name
+    assert [type(n) for n in dli] == [nodes.term, nodes.classifier, nodes.definition]
+    assert isinstance(term := dli[0], nodes.term)
+    assert [type(n) for n in term] == [nodes.Text]
+    assert term.astext() == "a"
+    assert isinstance(cyr := dli[1], nodes.classifier)
+    assert isinstance(cyr[0], addnodes.pending_xref)
+    assert isinstance(definition := dli[2], nodes.definition)
+    assert isinstance(definition[0], addnodes.compact_paragraph)
+    assert definition.astext() == "First parameter"
+
+
+@pytest.mark.parametrize(
+    ("threshold", "collapsed"), [(None, False), (1, True), (2, False)]
+)
+def test_collapse(
+    make_app_setup: MakeApp, threshold: int | None, *, collapsed: bool
+) -> None:
+    app = make_app_setup(field_items_collapse_threshold=threshold)
+    app.setup_extension("scanpydoc.definition_list_typed_field")
+    doc = parse(app, params_code)
+    [field_body] = doc.findall(nodes.field_body)
+    if not collapsed:
+        assert isinstance(field_body[0], nodes.definition_list)
+        return
+    assert isinstance(details := field_body[0], FieldItemsDetails)
+    assert details["summary"] == "2 parameters"
+    assert isinstance(dl := details[0], nodes.definition_list)
+    assert len(dl) == 2  # noqa: PLR2004
+
+
+def test_collapse_html(tmp_path: Path, make_app_setup: MakeApp) -> None:
+    app = make_app_setup(field_items_collapse_threshold=1)
+    app.setup_extension("scanpydoc.definition_list_typed_field")
+    (tmp_path / "index.rst").write_text(params_code)
+    app.build()
+    html = (tmp_path / "_build/html/index.html").read_text()
+    assert '<details class="field-items">\n<summary>2 parameters</summary>' in html
+
+
 def test_load_error(make_app_setup: MakeApp) -> None:
     with pytest.raises(RuntimeError, match=r"Please load sphinx\.ext\.napoleon before"):
         make_app_setup(
             extensions=["scanpydoc.definition_list_typed_field", "sphinx.ext.napoleon"]
         )
+
+
+def test_xref_templates(app: Sphinx) -> None:
+    code = """\
+.. py:module:: mod_a
+
+.. py:function:: f(a)
+
+   :param a: An a
+   :type a: SomeClass
+
+.. py:function:: g(a)
+
+   :param a: An a
+   :type a: SomeClass
+
+.. py:module:: mod_b
+
+.. py:function:: f(a)
+
+   :param a: An a
+   :type a: SomeClass
+"""
+    doc = parse(app, code)
+    xrefs = list(doc.findall(addnodes.pending_xref))
+    assert len(xrefs) == 3  # noqa: PLR2004
+    # copies of the same template aren’t shared …
+    assert xrefs[0] is not xrefs[1]
+    assert xrefs[0][0] is not xrefs[1][0]
+    assert xrefs[0].attributes == xrefs[1].attributes
+    # … and the context is respected
+    assert [x["py:module"] for x in xrefs] == ["mod_a", "mod_a", "mod_b"]
+    assert all(x["reftarget"] == "SomeClass" for x in xrefs)
+
+
+def test_deduplicate(tmp_path: Path, make_app_setup: MakeApp) -> None:
+    desc_shared = (
+        "The annotated data matrix. Rows correspond to cells, columns to genes. "
+        "Long enough to be shared."
+    )
+
+    def fn(name: str, desc: str = desc_shared) -> str:
+        return (
+            f".. py:function:: {name}(adata)\n\n"
+            f"   :param adata: {desc}\n"
+            "   :type adata: AnnData\n"
+        )
+
+    def build() -> set[str]:
+        app = make_app_setup(deduplicate_field_items=True)
+        app.setup_extension("scanpydoc.definition_list_typed_field")
+        read: set[str] = set()
+        app.connect("env-before-read-docs", lambda _a, _e, docs: read.update(docs))
+        app.build()
+        return read
+
+    def html(docname: str) -> str:
+        return (tmp_path / "_build" / "html" / f"{docname}.html").read_text()
+
+    (tmp_path / "index.rst").write_text(".. toctree::\n\n   a\n   b\n   c\n")
+    (tmp_path / "a.rst").write_text(f"A\n=\n\n{fn('f')}\n{fn('g')}")
+    (tmp_path / "b.rst").write_text(f"B\n=\n\n{fn('h')}")
+    (tmp_path / "c.rst").write_text(f"C\n=\n\n{fn('i', desc_shared + ' Or not.')}")
+    build()
+
+    [anchor] = re.findall(r'<dt id="(item-\w+)"', html("a"))
+    assert html("a").count(desc_shared) == 1
+    assert f'href="#{anchor}"' in html("a")
+    assert desc_shared not in html("b")
+    assert f'href="a.html#{anchor}"' in html("b")
+    assert "Or not." in html("c")
+
+    # when `a` stops rendering the item in full, `b` needs to
+    (tmp_path / "a.rst").write_text("A\n=\n")
+    assert build() == {"a", "b"}
+    assert desc_shared in html("b")
+    assert "item-" in html("b")
+
+
+def test_index(tmp_path: Path, make_app_setup: MakeApp) -> None:
+    def build() -> None:
+        app = make_app_setup(field_items_index=True)
+        app.setup_extension("scanpydoc.definition_list_typed_field")
+        app.build()
+
+    def read_json(name: str) -> Any:  # noqa: ANN401
+        return json.loads((tmp_path / "_build/html/_field_items" / name).read_text())
+
+    (tmp_path / "index.rst").write_text(".. toctree::\n\n   a\n   b\n")
+    (tmp_path / "a.rst").write_text(
+        "A\n=\n\n.. py:module:: mod_a\n\n"
+        ".. py:function:: f(x, y)\n\n   :param x: An x\n   :type x: int | None\n"
+        "   :param y: A y\n"
+    )
+    (tmp_path / "b.rst").write_text(
+        "B\n=\n\n.. py:module:: mod_b\n\n"
+        ".. py:class:: C(z)\n\n   :param z: A z\n\n"
+        ".. py:function:: g(z)\n   :no-index:\n\n   :param z: A z\n"
+    )
+    build()
+
+    assert read_json("index.json") == dict(
+        shards={"mod_a": "mod_a.json", "mod_b": "mod_b.json"}
+    )
+    assert read_json("mod_a.json") == {
+        "mod_a.f": dict(
+            url="a.html",
+            anchor="mod_a.f",
+            fields=dict(
+                parameter=[
+                    ["x", "int | None", "mod_a.f-parameter-x"],
+                    ["y", "", "mod_a.f-parameter-y"],
+                ]
+            ),
+        )
+    }
+    # objects without anchor aren’t indexed
+    assert list(read_json("mod_b.json")) == ["mod_b.C"]
+    assert 'id="mod_a.f-parameter-x"' in (tmp_path / "_build/html/a.html").read_text()
+
+    # removed objects and modules disappear from the index
+    (tmp_path / "b.rst").write_text("B\n=\n")
+    build()
+    assert read_json("index.json") == dict(shards={"mod_a": "mod_a.json"})
+    assert not (tmp_path / "_build/html/_field_items/mod_b.json").exists()
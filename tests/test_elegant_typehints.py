@@ -3,11 +3,16 @@
 from __future__ import annotations
 
 import re
+import sys
+import json
 import pickle
 import inspect
-from typing import TYPE_CHECKING, Any, AnyStr, NoReturn, cast, get_origin
+import logging
+import subprocess
+from typing import TYPE_CHECKING, Any, AnyStr, NoReturn, Annotated, cast, get_origin
 from pathlib import Path
 from operator import attrgetter
+from functools import singledispatch
 from itertools import combinations
 from collections.abc import Mapping, Callable
 from importlib.metadata import version
@@ -19,6 +24,7 @@ from sphinx.ext.intersphinx import InventoryAdapter
 
 from scanpydoc.elegant_typehints import (
     PickleableCallable,
+    FingerprintedMapping,
     _last_resolve,
     qualname_overrides,
 )
@@ -29,9 +35,11 @@ if TYPE_CHECKING:
     from io import StringIO
     from types import ModuleType
     from typing import Literal, Protocol, NamedTuple
-    from collections.abc import Generator
+    from collections.abc import Sequence, Generator
 
+    from sphinx.config import Config
     from sphinx.application import Sphinx
+    from sphinx.testing.util import SphinxTestApp
 
     from scanpydoc.testing import MakeApp
 
@@ -323,6 +331,74 @@ def test_qualname_overrides(
     ]
 
 
+def test_fmt_args_cached(
+    monkeypatch: pytest.MonkeyPatch, app: Sphinx, testmod: ModuleType
+) -> None:
+    import sphinx_autodoc_typehints
+
+    formatted: list[object] = []
+    format_orig = sphinx_autodoc_typehints.format_annotation
+
+    def format_annotation(annotation: object, config: Config) -> str:
+        formatted.append(annotation)
+        return format_orig(annotation, config)
+
+    monkeypatch.setattr(
+        sphinx_autodoc_typehints, "format_annotation", format_annotation
+    )
+
+    gen = testmod.Gen[testmod.Class]
+    first = typehints_formatter(gen, app.config)
+    assert typehints_formatter(gen, app.config) == first
+    assert formatted == [testmod.Class]
+    # shared arguments are reused
+    typehints_formatter(testmod.GenOld[testmod.Class], app.config)
+    assert formatted == [testmod.Class]
+    # unhashable arguments aren’t cached
+    unhashable = Annotated[int, {}]
+    typehints_formatter(testmod.Gen[unhashable], app.config)
+    typehints_formatter(testmod.Gen[unhashable], app.config)
+    assert formatted[1:] == [unhashable, unhashable]
+
+    app.emit("builder-inited")
+    typehints_formatter(gen, app.config)
+    assert formatted[-1] is testmod.Class
+
+
+def test_register_formatter(
+    monkeypatch: pytest.MonkeyPatch, app: Sphinx, testmod: ModuleType
+) -> None:
+    from scanpydoc.elegant_typehints import _formatting, register_formatter
+
+    monkeypatch.setattr(
+        _formatting,
+        "_format_class",
+        singledispatch(_formatting._format_class),  # noqa: SLF001
+    )
+    calls: list[tuple[type, object]] = []
+
+    @register_formatter(testmod.Class)
+    def fmt_class(
+        cls: type,
+        args: Sequence[object] | None,
+        config: Config,  # noqa: ARG001
+    ) -> str | None:
+        calls.append((cls, args))
+        return None if cls is testmod.SubCl else ":class:`Cls`"
+
+    assert typehints_formatter(testmod.Class, app.config) == ":class:`Cls`"
+    assert typehints_formatter(testmod.SubCl, app.config) is None
+    assert typehints_formatter(testmod.Gen[testmod.Class], app.config) == (
+        r":py:class:`~test.Gen`\ \[:class:`Cls`]"
+    )
+    assert calls == [
+        (testmod.Class, None),
+        (testmod.SubCl, None),
+        (testmod.Class, None),
+    ]
+    assert typehints_formatter(testmod.Excep, app.config) == ":py:exc:`~test.Excep`"
+
+
 @pytest.mark.parametrize(
     ("qualname", "docname"),
     [("testmod.Class", "test.Class"), ("testmod.Excep2", "test.Excep2")],
@@ -370,6 +446,107 @@ def test_resolve_failure(app: Sphinx, qualname: str) -> None:
     assert node["reftarget"] == target_ex
 
 
+@pytest.fixture
+def pubpkg(make_module: Callable[[str, str], ModuleType]) -> ModuleType:
+    make_module("pubpkg._impl", "class Foo: pass\nclass Bar: pass")
+    return make_module(
+        "pubpkg",
+        """\
+        import sys
+        Foo = sys.modules["pubpkg._impl"].Foo
+        Bar = sys.modules["pubpkg._impl"].Bar
+        __all__ = ["Foo"]
+        """,
+    )
+
+
+@pytest.mark.usefixtures("pubpkg")
+def test_public_index(monkeypatch: pytest.MonkeyPatch, make_app_setup: MakeApp) -> None:
+    from scanpydoc.elegant_typehints import _public_index
+
+    monkeypatch.setattr(_public_index, "_package_version", lambda _: "1.0")
+    app = make_app_setup(
+        extensions=["sphinx.ext.autodoc", "scanpydoc.elegant_typehints"],
+        qualname_overrides_from_packages=["pubpkg"],
+    )
+    assert qualname_overrides[None, "pubpkg._impl.Foo"] == (None, "pubpkg.Foo")
+    assert (None, "pubpkg._impl.Bar") not in qualname_overrides
+    cached = Path(app.doctreedir) / "scanpydoc-public-api-pubpkg-1.0.json"
+    assert cached.is_file()
+
+    # index is loaded from disk and user overrides take precedence
+    monkeypatch.setattr(_public_index, "build_index", pytest.fail)
+    make_app_setup(
+        extensions=["sphinx.ext.autodoc", "scanpydoc.elegant_typehints"],
+        qualname_overrides={"pubpkg._impl.Foo": "other.Foo"},
+        qualname_overrides_from_packages=["pubpkg"],
+    )
+    assert qualname_overrides[None, "pubpkg._impl.Foo"] == (None, "other.Foo")
+
+
+def test_validate_overrides(
+    caplog: pytest.LogCaptureFixture, app: Sphinx, make_app_setup: MakeApp
+) -> None:
+    from docutils.nodes import TextElement, reference
+    from sphinx.addnodes import pending_xref
+
+    from scanpydoc.elegant_typehints._inventory import validate_overrides
+
+    app.setup_extension("sphinx.ext.intersphinx")
+    item = _InventoryItem(
+        project_name="TestProj",
+        project_version="1",
+        uri="https://x.com",
+        display_name="-",
+    )
+    inv = InventoryAdapter(app.env).main_inventory
+    inv["py:exception"] = {"test.Excep": item}
+    inv["py:data"] = {"test.Class": item}
+    inv["py:class"] = {"pandas.DataFrame": item}
+
+    with caplog.at_level(logging.DEBUG):
+        validate_overrides(app)
+    assert qualname_overrides[None, "testmod.Excep"] == ("py:exc", "test.Excep")
+    assert qualname_overrides[None, "testmod.Class"] == ("py:data", "test.Class")
+    assert qualname_overrides[None, "testmod.SubCl"] == (None, "test.SubCl")
+    df = (None, "pandas.core.frame.DataFrame")
+    assert qualname_overrides[df] == ("py:class", "pandas.DataFrame")
+    [record] = [
+        r for r in caplog.records if "targets not found in intersphinx" in r.msg
+    ]
+    assert record.levelno < logging.INFO
+
+    # the inferred role is used for resolving
+    node = pending_xref(refdomain="py", reftarget="testmod.Class", reftype="class")
+    assert isinstance(_last_resolve(app, app.env, node, TextElement()), reference)
+    assert node["reftype"] == "data"
+
+    # inferred roles don’t leak into other apps
+    make_app_setup(extensions=["sphinx.ext.autodoc", "scanpydoc.elegant_typehints"])
+    assert qualname_overrides[df] == (None, "pandas.DataFrame")
+
+
+def test_resolve_skip_unknown(
+    monkeypatch: pytest.MonkeyPatch, app: Sphinx, testmod: ModuleType
+) -> None:
+    """Test that names not in any inventory aren’t resolved expensively."""
+    from sphinx.ext import intersphinx
+
+    app.setup_extension("sphinx.ext.intersphinx")
+    InventoryAdapter(app.env).main_inventory["py:type"] = {
+        "test.OtherAlias": _InventoryItem(
+            project_name="TestProj",
+            project_version="1",
+            uri="https://x.com",
+            display_name="-",
+        )
+    }
+    monkeypatch.setattr(intersphinx, "resolve_reference_detect_inventory", pytest.fail)
+    assert typehints_formatter(testmod.SomeAlias, app.config, app=app) == (
+        ":py:class:`int`"
+    )
+
+
 # These guys aren’t listed as classes in Python’s intersphinx index:
 @pytest.mark.parametrize(
     "annotation",
@@ -494,6 +671,362 @@ def test_fwd_ref(app: Sphinx, make_module: Callable[[str, str], ModuleType]) ->
     assert "fwd_mod.A" in out, out
 
 
+def test_collapse(
+    make_app_setup: MakeApp, make_module: Callable[[str, str], ModuleType]
+) -> None:
+    make_module(
+        "collapse_mod",
+        """\
+        from typing import Literal
+
+        def fn(a: Literal["a", "b", "c", "d"], b: int | str | None) -> None:
+            \"""Use big annotations.
+
+            :param a: An a
+            :param b: A b
+            \"""
+        """,
+    )
+    app = make_app_setup(
+        master_doc="index",
+        extensions=[
+            "sphinx.ext.autodoc",
+            "sphinx_autodoc_typehints",
+            "scanpydoc.elegant_typehints",
+        ],
+        annotation_collapse_threshold=3,
+    )
+    Path(app.srcdir, "index.rst").write_text(".. autofunction:: collapse_mod.fn\n")
+    app.build()
+
+    assert not (ws := cast("StringIO", app._warning).getvalue()), ws  # noqa: SLF001
+    out = Path(app.outdir, "index.html").read_text()
+    assert '<span class="pre">Literal[4</span> <span class="pre">options]' in out
+    assert "&#39;d&#39;" not in out
+    assert 'href="scanpydoc-annotations.html#ann-' in out
+    assert out.count("options]") == 1  # `b` has only 3 members
+    page = Path(app.outdir, "scanpydoc-annotations.html").read_text()
+    assert "<code>&#x27;d&#x27;</code>" in page
+
+
+def test_collapse_rebuild(
+    tmp_path: Path,
+    make_app_setup: MakeApp,
+    make_module: Callable[[str, str], ModuleType],
+) -> None:
+    """Collapsed annotations in return tuples are registered again when re-reading."""
+    make_module(
+        "collapse_rt_mod",
+        '''\
+        from typing import Literal
+
+        def fn() -> tuple[Literal["a", "b", "c", "d"], int]:
+            """Return a tuple.
+
+            Returns
+            -------
+            a
+                A letter
+            b
+                An int
+            """
+        ''',
+    )
+
+    def build() -> Sphinx:
+        app = make_app_setup(
+            extensions=[
+                "sphinx.ext.autodoc",
+                "sphinx.ext.napoleon",
+                "sphinx_autodoc_typehints",
+                "scanpydoc.elegant_typehints",
+            ],
+            annotation_collapse_threshold=3,
+            typehints_document_rtype=False,
+        )
+        app.build()
+        return app
+
+    (tmp_path / "index.rst").write_text(".. toctree::\n\n   a\n")
+    (a := tmp_path / "a.rst").write_text(
+        "A\n=\n\n.. autofunction:: collapse_rt_mod.fn\n"
+    )
+    build()
+    a.write_text(f"{a.read_text()}\n")
+    app = build()
+
+    assert app.env.scanpydoc_collapsed_annotations["a"]  # type: ignore[attr-defined]
+    out = Path(app.outdir, "a.html").read_text()
+    m = re.search(r'href="scanpydoc-annotations\.html#(ann-\w+)"', out)
+    assert m is not None, out
+    page = Path(app.outdir, "scanpydoc-annotations.html").read_text()
+    assert f'id="{m[1]}"' in page
+
+
+def test_override_usage_invalidation(
+    tmp_path: Path,
+    make_app_setup: MakeApp,
+    testmod: ModuleType,  # noqa: ARG001
+    make_module: Callable[[str, str], ModuleType],
+) -> None:
+    make_module(
+        "usage_mod",
+        """\
+        from testmod import Class
+
+        def fn_a(a: Class) -> None:
+            \"""Use an override.
+
+            :param a: An a
+            \"""
+
+        def fn_b(b: int) -> None:
+            \"""Don’t use an override.
+
+            :param b: A b
+            \"""
+        """,
+    )
+    extensions = [
+        "sphinx.ext.autodoc",
+        "sphinx_autodoc_typehints",
+        "scanpydoc.elegant_typehints",
+    ]
+
+    def build(overrides: dict[str, str]) -> set[str]:
+        app = make_app_setup(extensions=extensions, qualname_overrides=overrides)
+        read: set[str] = set()
+        app.connect("env-before-read-docs", lambda _a, _e, docs: read.update(docs))
+        app.build()
+        return read
+
+    (tmp_path / "index.rst").write_text(".. toctree::\n\n   a\n   b\n")
+    (tmp_path / "a.rst").write_text("A\n=\n\n.. autofunction:: usage_mod.fn_a\n")
+    (tmp_path / "b.rst").write_text("B\n=\n\n.. autofunction:: usage_mod.fn_b\n")
+    assert build({"testmod.Class": "test.Class"}) == {"index", "a", "b"}
+    assert build({"testmod.Class": "test.Class"}) == set()
+    assert build({"testmod.Class": "test.Class", "other.X": "test.X"}) == set()
+    assert build({"testmod.Class": "test.Class2"}) == {"a"}
+    assert "Class2" in (tmp_path / "_build" / "html" / "a.html").read_text()
+
+
+def test_override_usage_return_tuple(
+    tmp_path: Path,
+    make_app_setup: MakeApp,
+    make_module: Callable[[str, str], ModuleType],
+) -> None:
+    """Usage is recorded when return tuple docstrings come from the cache."""
+    make_module("rtimpl", "class Foo: pass\n")
+    make_module(
+        "rt_mod",
+        '''\
+        from rtimpl import Foo
+
+        def fn() -> tuple[Foo, int]:
+            """Return a tuple.
+
+            Returns
+            -------
+            a
+                A Foo
+            b
+                An int
+            """
+        ''',
+    )
+    extensions = [
+        "sphinx.ext.autodoc",
+        "sphinx.ext.napoleon",
+        "sphinx_autodoc_typehints",
+        "scanpydoc.elegant_typehints",
+    ]
+
+    def build(overrides: dict[str, str]) -> set[str]:
+        app = make_app_setup(
+            extensions=extensions,
+            qualname_overrides=overrides,
+            typehints_document_rtype=False,
+            typehints_fully_qualified=True,
+        )
+        read: set[str] = set()
+        app.connect("env-before-read-docs", lambda _a, _e, docs: read.update(docs))
+        app.build()
+        return read
+
+    (tmp_path / "index.rst").write_text(".. toctree::\n\n   a\n")
+    (a := tmp_path / "a.rst").write_text("A\n=\n\n.. autofunction:: rt_mod.fn\n")
+    assert build({"rtimpl.Foo": "pub.Foo"}) == {"index", "a"}
+    a.write_text(f"{a.read_text()}\n")
+    assert build({"rtimpl.Foo": "pub.Foo"}) == {"a"}  # the docstring is cached
+    assert build({"rtimpl.Foo": "pub2.Foo"}) == {"a"}
+    assert "pub2.Foo" in (tmp_path / "_build" / "html" / "a.html").read_text()
+
+
+def test_annotation_format_cache(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    make_app_setup: MakeApp,
+    testmod: ModuleType,  # noqa: ARG001
+    make_module: Callable[[str, str], ModuleType],
+) -> None:
+    from scanpydoc.elegant_typehints import _formatting, _annotation_cache
+
+    make_module(
+        "fmt_cache_mod",
+        """\
+        from testmod import Class, Gen
+
+        def fn(a: Gen[Class]) -> None:
+            \"""Use overrides.
+
+            :param a: An a
+            \"""
+        """,
+    )
+    formatted: list[object] = []
+    format_orig = _formatting._format_annotation  # noqa: SLF001
+
+    def format_annotation(annotation: object, *args: Any) -> str | None:  # noqa: ANN401
+        formatted.append(annotation)
+        return format_orig(annotation, *args)
+
+    monkeypatch.setattr(_formatting, "_format_annotation", format_annotation)
+
+    def build() -> Sphinx:
+        app = make_app_setup(
+            extensions=[
+                "sphinx.ext.autodoc",
+                "sphinx_autodoc_typehints",
+                "scanpydoc.elegant_typehints",
+            ],
+            qualname_overrides={
+                "testmod.Class": "test.Class",
+                "testmod.Gen": "test.Gen",
+            },
+            annotation_format_cache=True,
+        )
+        app.build()
+        return app
+
+    (tmp_path / "index.rst").write_text(".. autofunction:: fmt_cache_mod.fn\n")
+    app = build()
+    html = (tmp_path / "_build" / "html" / "index.html").read_text()
+    assert '<span class="pre">Gen</span></code>[<code' in html
+    assert formatted
+    assert (Path(app.doctreedir) / _annotation_cache.FILENAME).is_file()
+
+    formatted.clear()
+    (tmp_path / "index.rst").write_text(".. autofunction:: fmt_cache_mod.fn\n\n")
+    app = build()
+    assert formatted == [], "annotations should be read from the cache"
+    assert (tmp_path / "_build" / "html" / "index.html").read_text() == html
+    # lookups are replayed, so the document is still known to use the overrides
+    usage = app.env.scanpydoc_override_usage["index"]  # type: ignore[attr-defined]
+    assert {(None, "testmod.Class"), (None, "testmod.Gen")} <= usage.keys()
+
+
+def test_override_stats(
+    make_app_setup: MakeApp,
+    testmod: ModuleType,  # noqa: ARG001
+    make_module: Callable[[str, str], ModuleType],
+) -> None:
+    make_module(
+        "stats_mod",
+        """\
+        from testmod import Class, SubCl
+
+        def fn(a: Class) -> None:
+            \"""Use an override.
+
+            :param a: An a
+            \"""
+
+        class Sub(SubCl):
+            \"""Use an override in the bases.\"""
+        """,
+    )
+    app = make_app_setup(
+        master_doc="index",
+        extensions=[
+            "sphinx.ext.autodoc",
+            "sphinx_autodoc_typehints",
+            "scanpydoc.elegant_typehints",
+        ],
+        qualname_overrides={
+            "testmod.Class": "test.Class",
+            "testmod.SubCl": "test.SubCl",
+            "testmod.Unused": "test.Unused",
+        },
+        qualname_overrides_stats=True,
+        autodoc_use_legacy_class_based=True,
+        autodoc_typehints_format="fully-qualified",
+    )
+    Path(app.srcdir, "index.rst").write_text(
+        ".. autofunction:: stats_mod.fn\n\n"
+        ".. autoclass:: stats_mod.Sub\n   :show-inheritance:\n"
+    )
+    app.build()
+
+    summary = json.loads(
+        (Path(app.doctreedir) / "scanpydoc-override-stats.json").read_text()
+    )
+    assert {e["name"]: e["hits"] for e in summary["hottest"]} == {
+        "testmod.Class": 1,
+        "testmod.SubCl": 1,
+    }
+    assert summary["sites"]["type"]["hits"] == 1
+    assert summary["sites"]["autodoc-header"]["hits"] == 1
+    assert "testmod.Unused" in summary["unused"]
+    assert "testmod.Class" not in summary["unused"]
+    assert summary["total_seconds"] > 0
+    assert "qualname_overrides: " in cast("StringIO", app._status).getvalue()  # noqa: SLF001
+
+
+def test_override_stats_incremental(tmp_path: Path, make_app_setup: MakeApp) -> None:
+    """Overrides used to resolve references in unchanged documents count as used."""
+
+    def build() -> dict[str, Any]:
+        app = make_app_setup(
+            extensions=[
+                "sphinx.ext.autodoc",
+                "sphinx.ext.intersphinx",
+                "scanpydoc.elegant_typehints",
+            ],
+            qualname_overrides={"foo.private.Bar": ("py:class", "foo.Bar")},
+            qualname_overrides_stats=True,
+            html_theme="alabaster",
+        )
+        InventoryAdapter(app.env).main_inventory["py:class"] = {
+            "foo.Bar": _InventoryItem(
+                project_name="TestProj",
+                project_version="1",
+                uri="https://x.com/#foo.Bar",
+                display_name="foo.Bar",
+            )
+        }
+        app.build()
+        return cast(
+            "dict[str, Any]",
+            json.loads(
+                (Path(app.doctreedir) / "scanpydoc-override-stats.json").read_text()
+            ),
+        )
+
+    (tmp_path / "index.rst").write_text(".. toctree::\n\n   prose\n   other\n")
+    (tmp_path / "prose.rst").write_text(
+        "Prose\n=====\n\nSee :class:`foo.private.Bar`.\n"
+    )
+    (other := tmp_path / "other.rst").write_text("Other\n=====\n")
+    summary = build()
+    assert "foo.private.Bar" not in summary["unused"]
+    assert summary["sites"]["missing-reference"]["hits"] == 1
+
+    other.write_text(f"{other.read_text()}\nChanged.\n")
+    summary = build()
+    assert "foo.private.Bar" not in summary["unused"]
+    assert summary["sites"]["missing-reference"]["hits"] == 1
+
+
 @pytest.mark.parametrize(
     "docstring",
     [
@@ -603,6 +1136,29 @@ def test_return_tuple_anonymous(process_doc: ProcessDoc) -> None:
     ]
 
 
+def test_return_tuple_stream(app: Sphinx) -> None:
+    from scanpydoc.elegant_typehints._return_tuple import iter_typed_returns
+
+    lines = [
+        ":param x: An x",
+        ":returns: foo",
+        "              A foo!",
+        "          bar",
+        "              A bar!",
+        ":rtype: tuple",
+    ]
+    typed = iter_typed_returns((l for l in lines), (str, int), app.config)
+    assert list(typed) == [
+        ":param x: An x",
+        ":returns: foo : :py:class:`str`",
+        "              A foo!",
+        "          bar : :py:class:`int`",
+        "              A bar!",
+        ":rtype: tuple",
+    ]
+    assert list(iter_typed_returns(iter(lines), (str,), app.config)) == lines
+
+
 def test_return_nodoc(process_doc: ProcessDoc) -> None:
     def fn() -> tuple[int, str]:  # pragma: no cover
         """No return section."""
@@ -614,6 +1170,144 @@ def test_return_nodoc(process_doc: ProcessDoc) -> None:
     assert res[2].startswith(":rtype: :sphinx_autodoc_typehints_type:")
 
 
+def test_return_tuple_cached(
+    monkeypatch: pytest.MonkeyPatch,
+    process_doc: ProcessDoc,
+    make_module: Callable[[str, str], ModuleType],
+) -> None:
+    from scanpydoc.elegant_typehints import _return_tuple
+
+    mod = make_module(
+        "cached_mod",
+        '''\
+        def fn() -> tuple[int, str]:
+            """Test function.
+
+            Returns
+            -------
+            a
+                An int
+            b
+                A str
+            """
+        ''',
+    )
+    calls: list[object] = []
+
+    def get_type_hints(obj: object) -> dict[str, Any]:
+        calls.append(obj)
+        return inspect.get_annotations(obj, eval_str=True)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(_return_tuple, "get_type_hints", get_type_hints)
+
+    lines = process_doc(mod.fn, run_napoleon=True)
+    assert ":returns: a : :py:class:`int`" in lines
+    assert process_doc(mod.fn, run_napoleon=True) == lines
+    assert calls == [mod.fn], "second run should be cached"
+
+    # changing the module’s source evicts its cache entries
+    assert mod.__file__ is not None
+    (path := Path(mod.__file__)).write_text(f"{path.read_text()}\n")
+    assert process_doc(mod.fn, run_napoleon=True) == lines
+    assert calls == [mod.fn, mod.fn]
+
+
+def test_return_tuple_type_checking(
+    app: Sphinx, make_module: Callable[[str, str], ModuleType]
+) -> None:
+    from sphinx.ext.napoleon import _process_docstring
+
+    from scanpydoc.elegant_typehints._return_tuple import process_docstring
+
+    mod = make_module(
+        "tc_mod",
+        '''\
+        from typing import TYPE_CHECKING
+
+        if TYPE_CHECKING:
+            import heavy_pkg.sub as hs
+            from heavy_pkg import Thing
+
+        def fn() -> tuple[Thing, hs.Other[int]]:
+            """Test function.
+
+            Returns
+            -------
+            a
+                A thing
+            b
+                Another thing
+            """
+        ''',
+    )
+    app.env.prepare_settings("tc_mod")
+    lines = (inspect.getdoc(mod.fn) or "").split("\n")
+    # skip sphinx-autodoc-typehints, which imports (or mocks) guarded names
+    for listener in (_process_docstring, process_docstring):
+        listener(app, "function", "fn", mod.fn, None, lines)
+    assert ":returns: a : :py:class:`~heavy_pkg.Thing`" in lines
+    assert "b : :py:class:`~heavy_pkg.sub.Other`\\ \\[:py:class:`int`]" in map(
+        str.strip, lines
+    )
+    assert "heavy_pkg" not in sys.modules
+
+
+def test_parallel_build(
+    tmp_path: Path,
+    make_app: Callable[..., SphinxTestApp],
+    make_module: Callable[[str, str], ModuleType],
+) -> None:
+    n = 8  # Sphinx only reads in parallel if there are enough documents
+    make_module(
+        "par_mod",
+        "\n".join(
+            f'''\
+def f{i}() -> tuple[int, str]:
+    """Test function {i}.
+
+    Returns
+    -------
+    a
+        An int
+    b
+        A str
+    """
+'''
+            for i in range(n)
+        ),
+    )
+    (tmp_path / "conf.py").write_text("")
+    (tmp_path / "index.rst").write_text(
+        ".. toctree::\n\n" + "".join(f"   f{i}\n" for i in range(n))
+    )
+    for i in range(n):
+        (tmp_path / f"f{i}.rst").write_text(f".. autofunction:: par_mod.f{i}\n")
+    app = make_app(
+        "html",
+        srcdir=tmp_path,
+        parallel=3,
+        confoverrides=dict(
+            extensions=[
+                "sphinx.ext.autodoc",
+                "sphinx.ext.napoleon",
+                "sphinx_autodoc_typehints",
+                "scanpydoc.elegant_typehints",
+            ],
+        ),
+    )
+    assert app.is_parallel_allowed("read")
+    assert app.is_parallel_allowed("write")
+    app.build()
+
+    assert not (ws := cast("StringIO", app._warning).getvalue()), ws  # noqa: SLF001
+    for i in range(n):
+        out = Path(app.outdir, f"f{i}.html").read_text()
+        assert "An int" in out
+    # docstring caches from parallel readers are merged
+    _, entries = app.env.scanpydoc_docstring_cache["par_mod"]  # type: ignore[attr-defined]
+    assert len(entries) == n
+
+
 def fn(*args: object, **kwargs: object) -> None: ...  # pragma: no cover
 
 
@@ -645,6 +1339,29 @@ def test_cmp_callback(
     ):
         with subtests.test(f"{n0} == {n1}"):
             assert cb0 == cb1
+            # Sphinx detects config changes via `str`
+            assert str(cb0) == str(cb1)
+
+
+def test_overrides_fingerprint(app: Sphinx) -> None:
+    from sphinx.util._serialise import stable_str
+
+    from scanpydoc._pickle_size import pickle_sizes
+
+    overrides = app.config.qualname_overrides
+    assert isinstance(overrides, FingerprintedMapping)
+    assert overrides["testmod.Class"] == "test.Class"
+
+    unpickled = pickle.loads(pickle.dumps(overrides))  # noqa: S301
+    assert unpickled == overrides
+    assert not unpickled
+    assert stable_str(unpickled) == stable_str(overrides)
+    changed = FingerprintedMapping({**overrides, "testmod.Other": "test.Other"})
+    assert stable_str(changed) != stable_str(overrides)
+
+    sizes = pickle_sizes(app)
+    assert set(sizes) >= {"config.qualname_overrides", "config.typehints_formatter"}
+    assert sizes["config.qualname_overrides"] < len(pickle.dumps(dict(overrides)))
 
 
 def test_load_without_sat(make_app_setup: MakeApp) -> None:
@@ -654,6 +1371,24 @@ def test_load_without_sat(make_app_setup: MakeApp) -> None:
     )
 
 
+def test_lazy_imports(tmp_path: Path) -> None:
+    (tmp_path / "conf.py").write_text('extensions = ["sphinx.ext.autodoc"]')
+    code = f"""\
+import sys
+from sphinx.application import Sphinx
+d = {str(tmp_path)!r}
+app = Sphinx(d, d, f"{{d}}/_build", f"{{d}}/_doctrees", "html", status=None)
+import scanpydoc.elegant_typehints
+heavy = {{"scanpydoc.elegant_typehints._formatting", "sqlite3"}}
+assert not heavy & set(sys.modules), heavy & set(sys.modules)
+app.setup_extension("scanpydoc.elegant_typehints")
+lazy = {{"sphinx_autodoc_typehints", "sphinx.ext.napoleon", "sphinx.ext.intersphinx"}}
+assert not lazy & set(sys.modules), lazy & set(sys.modules)
+from scanpydoc.elegant_typehints import example_func_tuple, register_formatter
+"""
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
+
+
 def test_load_error(make_app_setup: MakeApp) -> None:
     with pytest.raises(
         RuntimeError,
@@ -663,3 +1398,63 @@ def test_load_error(make_app_setup: MakeApp) -> None:
             master_doc="index",
             extensions=["scanpydoc.elegant_typehints"],
         )
+
+
+def test_override_usage_xrefs(make_app_setup: MakeApp) -> None:
+    """Only references that could be resolved using overrides are recorded."""
+    app = make_app_setup(
+        master_doc="index",
+        extensions=["sphinx.ext.autodoc", "scanpydoc.elegant_typehints"],
+        qualname_overrides={"foo.private.Bar": "foo.Bar"},
+    )
+    Path(app.srcdir, "index.rst").write_text(
+        "See :class:`foo.private.Bar`, :class:`foo.private.Baz`,\n"
+        ":func:`unrelated.fn` and :doc:`index`.\n"
+    )
+    app.build()
+
+    usage = app.env.scanpydoc_override_usage["index"]  # type: ignore[attr-defined]
+    assert set(usage) == {
+        ("py:class", "foo.private.Bar"),
+        ("py:class", "foo.private.Baz"),  # overrides for it would be nearby
+    }
+
+
+def test_override_usage_resolve(tmp_path: Path, make_app_setup: MakeApp) -> None:
+    """References only resolved using overrides invalidate their documents."""
+    extensions = [
+        "sphinx.ext.autodoc",
+        "sphinx.ext.intersphinx",
+        "scanpydoc.elegant_typehints",
+    ]
+
+    def build(overrides: dict[str, str]) -> set[str]:
+        app = make_app_setup(extensions=extensions, qualname_overrides=overrides)
+        InventoryAdapter(app.env).main_inventory["py:class"] = {
+            name: _InventoryItem(
+                project_name="TestProj",
+                project_version="1",
+                uri=f"https://x.com/#{name}",
+                display_name=name,
+            )
+            for name in ["foo.Bar", "foo.Baz"]
+        }
+        read: set[str] = set()
+        app.connect("env-before-read-docs", lambda _a, _e, docs: read.update(docs))
+        app.build()
+        return read
+
+    (tmp_path / "index.rst").write_text(".. toctree::\n\n   prose\n")
+    (tmp_path / "prose.rst").write_text(
+        "Prose\n=====\n\nSee :class:`foo.private.Bar`.\n"
+    )
+    assert build({"foo.private.Bar": "foo.Bar"}) == {"index", "prose"}
+    assert (
+        'href="https://x.com/#foo.Bar"'
+        in (tmp_path / "_build/html/prose.html").read_text()
+    )
+    assert build({"foo.private.Bar": "foo.Baz"}) == {"prose"}
+    assert (
+        'href="https://x.com/#foo.Baz"'
+        in (tmp_path / "_build/html/prose.html").read_text()
+    )
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import os
+import time
 from types import MappingProxyType
 from typing import TYPE_CHECKING
+from pathlib import Path
 from textwrap import dedent
 from functools import partial
 
@@ -13,12 +16,14 @@ from docutils.utils import new_document
 from docutils.languages import get_language
 from docutils.parsers.rst import directives
 
+from scanpydoc.release_notes import FULL_VERSION_RE
+
 
 if TYPE_CHECKING:
-    from typing import Literal
-    from pathlib import Path
+    from typing import Any, Literal
     from collections.abc import Mapping
 
+    from docutils import nodes
     from sphinx.application import Sphinx
     from sphinx.testing.util import SphinxTestApp
 
@@ -171,3 +176,46 @@ def test_error_no_src(
     mkfiles(tmp_path, files)
     with pytest.raises(SphinxWarning, match=r"Cannot find relative path to: <string>"):
         app.build()
+
+
+def test_incremental(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    app: Sphinx,
+    files: Tree,
+    file_format: Literal["rst", "myst"],
+) -> None:
+    from sphinx.util.parsing import nested_parse_to_nodes
+
+    if file_format == "rst":  # files with warnings aren’t cached
+        files = {f: str(c).replace("\n", "\n\n", 1) for f, c in files.items()}
+    mkfiles(tmp_path, files)
+    app.build()
+    version_files = {tmp_path / f for f in files if FULL_VERSION_RE.match(Path(f).stem)}
+    assert version_files <= app.env.dependencies["index"]
+
+    parsed: list[str] = []
+
+    def parse(*args: Any, source: str, **kwargs: Any) -> list[nodes.Node]:  # noqa: ANN401
+        parsed.append(Path(source).name)
+        return nested_parse_to_nodes(*args, source=source, **kwargs)
+
+    monkeypatch.setattr("scanpydoc.release_notes.nested_parse_to_nodes", parse)
+
+    # a changed file (with identical output) gets re-parsed, the others are reused
+    changed = next(f for f in files if str(f).startswith("1.2.0"))
+    later = time.time() + 10
+    (tmp_path / changed).write_text(f"{files[changed]}\n")
+    os.utime(tmp_path / changed, (later, later))
+    app.build()
+    assert parsed == ([] if file_format == "myst" else [changed])
+    index_out = (tmp_path / "_build/pseudoxml/index.pseudoxml").read_text()
+    assert (
+        "\n".join(l[4:] for l in dedent(index_out).splitlines()[1:]) == expected.strip()
+    )
+
+    # added files are detected
+    (tmp_path / changed).with_stem("1.1.0").write_text(files[changed])  # type: ignore[arg-type]
+    app.build()
+    index_out = (tmp_path / "_build/pseudoxml/index.pseudoxml").read_text()
+    assert "Version 1.1" in index_out